@@ -0,0 +1,414 @@
+"""
+WiFiVision - Detection Core
+Serial reading, CSI parsing and presence detection without any plotting,
+shared by the visual dashboard and usable headless:
+
+    python -c "from detect_core import stream_detect; stream_detect()"
+"""
+import serial
+import time
+import queue
+import threading
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to plain NumPy
+    njit = None
+
+# Configuration
+PORT = 'COM5'
+BAUD_RATE = 921600
+WINDOW_SIZE = 100
+MAX_POINTS = 200
+VARIANCE_WINDOW = 50  # Samples in the movement variance window
+
+# Detection state
+baseline_var = 1.0
+threshold = 3.0
+is_present = False
+confidence = 0.0
+current_rssi = -50
+start_time = None
+
+# Serial connection
+ser = None
+
+# (time, rssi, mean amplitude) samples from the reader thread
+sample_queue = queue.SimpleQueue()
+_reader_thread = None
+
+# Characters wrapping the CSI array in esp-csi output ("[...]")
+_CSI_STRIP = str.maketrans('', '', '[]"')
+
+def _csi_amplitudes(text):
+    """Amplitudes of the (imag, real) CSI values, skipping the first 2 (invalid)."""
+    # Tokenize the value list in one C call
+    raw = np.fromstring(text.translate(_CSI_STRIP), sep=',', dtype=np.int16)
+    pairs = raw[:len(raw) // 2 * 2].reshape(-1, 2)
+    amplitudes = np.hypot(pairs[:, 1], pairs[:, 0], dtype=np.float32)
+    return amplitudes[2:] if len(amplitudes) > 2 else amplitudes
+
+if njit is not None:
+    @njit(fastmath=True)
+    def _scan_amplitudes(buf, out):
+        """Parse ASCII (imag, real) values straight into amplitudes; returns the count."""
+        n_values = 0
+        imag = 0.0
+        value = 0
+        negative = False
+        in_number = False
+        for i in range(len(buf) + 1):
+            c = buf[i] if i < len(buf) else 44  # Trailing ',' ends the last value
+            if 48 <= c <= 57:  # '0'-'9'
+                value = value * 10 + (c - 48)
+                in_number = True
+            elif c == 45:  # '-'
+                negative = True
+            elif c == 44 or c == 93:  # ',' or ']'
+                if in_number:
+                    v = np.float32(-value if negative else value)
+                    if n_values % 2 == 0:
+                        imag = v
+                    else:
+                        out[n_values // 2] = np.sqrt(v * v + imag * imag)
+                    n_values += 1
+                value = 0
+                negative = False
+                in_number = False
+        return n_values // 2
+
+    def _csi_amplitudes(text):
+        buf = np.frombuffer(text.encode('ascii', 'ignore'), dtype=np.uint8)
+        # Every pair takes at least 4 bytes ("1,1,")
+        out = np.empty(len(buf) // 4 + 1, dtype=np.float32)
+        n = _scan_amplitudes(buf, out)
+        return out[2:n] if n > 2 else out[:n]
+
+    # Compile up front (~100 ms) rather than on the first frame
+    _csi_amplitudes('0,1,2,3,4,5')
+
+class RollingVar:
+    """Running variance of a sliding window (Welford, with removal)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        """Add a sample to the window."""
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        """Remove a sample that was added earlier."""
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.n -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 = max(self.m2 - delta * (x - self.mean), 0.0)
+
+    @property
+    def var(self):
+        """Population variance of the samples in the window (as np.var)."""
+        return self.m2 / self.n if self.n else 0.0
+
+class RingBuffer:
+    """Fixed-size NumPy buffer keeping the most recent samples."""
+
+    def __init__(self, size):
+        self.data = np.zeros(size)
+        self.idx = 0  # Next slot to write
+        self.filled = 0
+
+    def append(self, x):
+        """Add a sample, overwriting the oldest once full."""
+        self.data[self.idx] = x
+        self.idx = (self.idx + 1) % len(self.data)
+        self.filled = min(self.filled + 1, len(self.data))
+
+    def __len__(self):
+        return self.filled
+
+    def __getitem__(self, i):
+        """Sample i (negative, as in a deque) counted back from the newest."""
+        return self.data[(self.idx + i) % len(self.data)]
+
+    def values(self):
+        """Filled samples in insertion order (oldest first)."""
+        return np.concatenate((self.data[self.idx:self.filled], self.data[:self.idx]))
+
+    def filled_view(self):
+        """Filled samples in ring order, for order-independent reductions."""
+        return self.data[:self.filled]
+
+# Global data buffers
+amplitude_history = RingBuffer(MAX_POINTS)
+variance_history = RingBuffer(MAX_POINTS)
+rssi_history = RingBuffer(MAX_POINTS)
+time_history = RingBuffer(MAX_POINTS)
+
+# Movement variance over the last VARIANCE_WINDOW mean amplitudes
+rolling_var = RollingVar()
+
+def _parse_rssi(field):
+    """RSSI field as an int, 0 if malformed."""
+    try:
+        return int(field)
+    except ValueError:
+        return 0
+
+def parse_csi_line(line):
+    """Parse CSI_DATA line and extract amplitude."""
+    try:
+        parts = line.split(',', 24)
+        if len(parts) < 25:
+            return None
+
+        rssi = _parse_rssi(parts[3])
+
+        # Raw CSI data starts at index 24
+        return {'rssi': rssi, 'amplitude': _csi_amplitudes(parts[24])}
+    except:
+        return None
+
+def parse_csi_packet(raw):
+    """
+    Parse a raw serial line (bytes) into (rssi, amplitudes, mean amplitude), or None.
+
+    The amplitudes may be a view into a buffer reused by the next call,
+    so copy them to keep them around. The mean is 0.0 if there are none.
+    """
+    line = raw.decode('utf-8', errors='ignore').strip()
+    if not line.startswith('CSI_DATA'):
+        return None
+    parsed = parse_csi_line(line)
+    if not parsed:
+        return None
+    amplitudes = parsed['amplitude']
+    return parsed['rssi'], amplitudes, float(np.mean(amplitudes)) if len(amplitudes) else 0.0
+
+if njit is not None:
+    _CSI_PREFIX = tuple(b'CSI_DATA')
+
+    @njit(fastmath=True)
+    def _scan_packet(buf, out):
+        """Parse a whole CSI_DATA line in one pass; returns (amplitude count or -1, rssi, mean)."""
+        i = 0
+        while i < len(buf) and buf[i] <= 32:  # Leading whitespace
+            i += 1
+        if len(buf) - i < len(_CSI_PREFIX):
+            return -1, 0, 0.0
+        for k in range(len(_CSI_PREFIX)):
+            if buf[i + k] != _CSI_PREFIX[k]:
+                return -1, 0, 0.0
+
+        # Skip to field 24, picking up the RSSI (field 3) on the way
+        field = 0
+        rssi = 0
+        rssi_digits = False
+        rssi_negative = False
+        rssi_valid = True
+        while i < len(buf) and field < 24:
+            c = buf[i]
+            if c == 44:  # ','
+                field += 1
+            elif field == 3:
+                if 48 <= c <= 57:
+                    rssi = rssi * 10 + (c - 48)
+                    rssi_digits = True
+                elif c == 45 and not rssi_digits and not rssi_negative:
+                    rssi_negative = True
+                else:
+                    rssi_valid = False
+            i += 1
+        if field < 24:
+            return -1, 0, 0.0
+        if not (rssi_valid and rssi_digits):
+            rssi = 0
+        elif rssi_negative:
+            rssi = -rssi
+
+        n = _scan_amplitudes(buf[i:], out)
+
+        # Mean of the amplitudes that are kept, while they are still in cache
+        first = 2 if n > 2 else 0
+        total = 0.0
+        for k in range(first, n):
+            total += out[k]
+        return n, rssi, total / (n - first) if n > first else 0.0
+
+    _packet_amplitudes = np.empty(512, dtype=np.float32)
+
+    def parse_csi_packet(raw):
+        global _packet_amplitudes
+        buf = np.frombuffer(raw, dtype=np.uint8)
+        # Same bound as _csi_amplitudes: every pair takes at least 4 bytes
+        if len(buf) // 4 + 1 > len(_packet_amplitudes):
+            _packet_amplitudes = np.empty(len(buf) // 4 + 1, dtype=np.float32)
+        n, rssi, mean_amp = _scan_packet(buf, _packet_amplitudes)
+        if n < 0:
+            return None
+        return rssi, (_packet_amplitudes[2:n] if n > 2 else _packet_amplitudes[:n]), mean_amp
+
+    # Compile up front rather than on the first frame
+    parse_csi_packet(b'CSI_DATA' + b',0' * 24 + b',[0,1,2,3]')
+
+def reader_loop(ser, q):
+    """Read and parse serial data in a background thread, queueing each sample."""
+    tail = b''  # Partial line left over from the previous read
+    while True:
+        try:
+            # Take everything buffered in one call; the timeout only
+            # applies while waiting for the first byte
+            data = ser.read(max(1, ser.in_waiting))
+        except Exception:
+            if not ser.is_open:  # Port closed on exit
+                break
+            continue
+        if not data:
+            continue
+        lines = (tail + data).split(b'\n')
+        tail = lines.pop()
+        now = time.time()
+        for raw in lines:
+            packet = parse_csi_packet(raw)
+            if packet and len(packet[1]) > 0:
+                q.put((now, packet[0], packet[2]))
+
+def start_reader():
+    """Start reader_loop on the open port in a daemon thread, unless it is running."""
+    global _reader_thread
+    if _reader_thread is None or not _reader_thread.is_alive():
+        _reader_thread = threading.Thread(target=reader_loop, args=(ser, sample_queue), daemon=True)
+        _reader_thread.start()
+
+def drain_samples():
+    """Apply every queued sample to the detection state; returns how many."""
+    global is_present, confidence, current_rssi
+
+    count = 0
+    while True:
+        try:
+            sample_time, rssi, mean_amp = sample_queue.get_nowait()
+        except queue.Empty:
+            return count
+        count += 1
+        if rolling_var.n == VARIANCE_WINDOW:
+            rolling_var.remove(amplitude_history[-VARIANCE_WINDOW])
+        rolling_var.add(mean_amp)
+        amplitude_history.append(mean_amp)
+        current_rssi = rssi
+        rssi_history.append(current_rssi)
+
+        elapsed = sample_time - start_time
+        time_history.append(elapsed)
+
+        # Calculate variance (O(1) per sample)
+        if len(amplitude_history) >= 20:
+            var = rolling_var.var
+            variance_history.append(var)
+
+            is_present = var > threshold
+            confidence = min(1.0, var / (threshold * 2))
+
+def calibrate():
+    """Calibrate with empty room."""
+    global baseline_var, threshold
+
+    print("\n" + "="*50)
+    print("CALIBRATION - Keep room EMPTY for 10 seconds")
+    print("="*50)
+
+    for i in range(3, 0, -1):
+        print(f"Starting in {i}...")
+        time.sleep(1)
+
+    # Same reader and parser as detection; drop what queued up meanwhile
+    start_reader()
+    time.sleep(0.5)
+    while True:
+        try:
+            sample_queue.get_nowait()
+        except queue.Empty:
+            break
+
+    print("Collecting baseline...")
+    baseline = RollingVar()  # Only added to, so this is the variance of all samples
+    end = time.time() + 10
+
+    while time.time() < end:
+        try:
+            sample = sample_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        baseline.add(sample[2])
+        # Take the rest of the queue before the next progress update
+        while True:
+            try:
+                baseline.add(sample_queue.get_nowait()[2])
+            except queue.Empty:
+                break
+        print(f"\r  Samples: {baseline.n}", end='', flush=True)
+
+    print()
+
+    if baseline.n > 50:
+        baseline_var = baseline.var
+        threshold = baseline_var * 3.0
+        print(f"Baseline variance: {baseline_var:.2f}")
+        print(f"Detection threshold: {threshold:.2f}")
+    else:
+        print(f"Warning: Low sample count ({baseline.n}), using defaults")
+        baseline_var = 1.0
+        threshold = 3.0
+
+    return True
+
+def connect():
+    """Open the serial port; returns False if it can't be opened."""
+    global ser
+
+    print("Connecting to ESP32...")
+    try:
+        ser = serial.Serial(PORT, BAUD_RATE, timeout=0.1)
+        time.sleep(2)
+        ser.flushInput()
+        print("Connected!")
+        return True
+    except Exception as e:
+        print(f"ERROR: Could not connect to {PORT}")
+        print(f"Make sure ESP32 is plugged in and no other program is using the port.")
+        return False
+
+def stream_detect(interval=0.1):
+    """Headless detection: calibrate, then print the presence status."""
+    global start_time
+
+    if not connect():
+        return
+    calibrate()
+
+    start_time = time.time()
+    start_reader()
+    print("Detecting... (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(interval)
+            drain_samples()
+            status = 'PRESENCE DETECTED' if is_present else 'No presence'
+            print(f"\r{status:<18} | Confidence: {confidence*100:3.0f}% | RSSI: {current_rssi} dBm",
+                  end='', flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ser.close()
+        print("\nDisconnected from ESP32")
+
+if __name__ == '__main__':
+    stream_detect()
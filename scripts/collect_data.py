@@ -2,7 +2,8 @@
 """
 CSI Data Collection Script
 
-Collects CSI data from ESP32 serial port and saves to CSV file.
+Collects CSI data from ESP32 serial port and saves to CSV file
+(or a NumPy .npz recording, which loads much faster).
 
 Usage:
     python collect_data.py --port COM3 --duration 60 --output data.csv
@@ -48,7 +49,12 @@ def main():
     parser.add_argument(
         '--output', '-o',
         default='csi_data.csv',
-        help='Output CSV file path (default: csi_data.csv)'
+        help='Output file path, CSV or .npz (default: csi_data.csv)'
+    )
+    parser.add_argument(
+        '--binary',
+        action='store_true',
+        help='ESP32 sends binary CSI frames (see firmware/README.md)'
     )
 
     args = parser.parse_args()
@@ -67,7 +73,7 @@ def main():
     print(f"=" * 40)
     print()
 
-    collector = CSICollector(port=args.port, baud_rate=args.baud)
+    collector = CSICollector(port=args.port, baud_rate=args.baud, binary=args.binary)
 
     try:
         frames = collector.collect_blocking(
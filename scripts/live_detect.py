@@ -12,6 +12,7 @@ import sys
 import os
 import argparse
 import time
+import threading
 import numpy as np
 
 # Add src to path
@@ -25,21 +26,41 @@ from parser import parse_csi_line
 class LiveDetector:
     """Real-time CSI-based human detection."""
 
+    # Frames used for the empty room baseline (as in PresenceDetector.calibrate)
+    CALIBRATION_FRAMES = 500
+
+    # Max status line refresh rate (seconds)
+    DISPLAY_INTERVAL = 1 / 30
+
+    # Print collection statistics every this many parsed frames
+    STATS_INTERVAL = 1000
+
+    # Confidence bars for 0..20 filled cells
+    BARS = tuple('\u2588' * n + '\u2591' * (20 - n) for n in range(21))
+
     def __init__(
         self,
         port: str,
         baud_rate: int = 921600,
-        window_size: int = 100
+        window_size: int = 100,
+        binary: bool = False,
+        use_magnitude_squared: bool = False
     ):
         self.port = port
         self.baud_rate = baud_rate
         self.window_size = window_size
 
-        self.collector = CSICollector(port, baud_rate)
-        self.preprocessor = CSIPreprocessor()
+        self.collector = CSICollector(port, baud_rate, binary=binary)
+        self.preprocessor = CSIPreprocessor(use_magnitude_squared=use_magnitude_squared)
         self.presence_detector = PresenceDetector(window_size=window_size)
 
-        self.amplitude_buffer = []
+        # Live state used by on_batch while run() is active
+        self._live_viz = None
+        self._stats_event = threading.Event()
+        self._last_display = 0.0
+        self._last_stats = 0
+        # Newest (amplitude, variance, present, threshold) for run() to plot
+        self._latest_plot = None
 
     def calibrate(self, duration_seconds: float = 10.0):
         """
@@ -58,14 +79,34 @@ class LiveDetector:
         time.sleep(1)
         print("Collecting baseline data...")
 
-        frames = self.collector.collect_blocking(
-            duration_seconds=duration_seconds,
-            progress_callback=lambda p, e: print(f"\r  {p} frames...", end='')
-        )
+        # Welford running variance of the mean amplitude, no frames are kept
+        n_frames = 0
+        n_baseline = 0
+        mean = 0.0
+        m2 = 0.0
+
+        def store_frame(frame):
+            nonlocal n_frames, n_baseline, mean, m2
+            n_frames += 1
+            if n_baseline < self.CALIBRATION_FRAMES:
+                x = float(np.mean(self.preprocessor.frame_magnitude(frame)))
+                n_baseline += 1
+                delta = x - mean
+                mean += delta / n_baseline
+                m2 += delta * (x - mean)
+
+        self.collector.add_callback(store_frame)
+        try:
+            self.collector.collect_blocking(
+                duration_seconds=duration_seconds,
+                progress_callback=lambda p, e: print(f"\r  {p} frames...", end=''),
+                keep_frames=False
+            )
+        finally:
+            self.collector.remove_callback(store_frame)
 
-        if len(frames) > 100:
-            amplitudes = np.array([f['amplitude'] for f in frames])
-            self.presence_detector.calibrate(amplitudes)
+        if n_frames > 100:
+            self.presence_detector.calibrate_from_variance(m2 / n_baseline)
             print("\nCalibration complete!")
             return True
         else:
@@ -83,60 +124,93 @@ class LiveDetector:
         print("Press Ctrl+C to stop\n")
 
         # Set up visualization if requested
-        live_viz = None
+        self._live_viz = None
         if visualize:
             try:
                 from visualizer import LiveVisualizer
-                live_viz = LiveVisualizer(window_size=200)
-                live_viz.setup()
+                self._live_viz = LiveVisualizer(window_size=200)
+                self._live_viz.setup()
             except Exception as e:
                 print(f"Could not initialize visualization: {e}")
                 visualize = False
 
-        # Start collection
-        self.collector.start_collection()
-
-        # Add detection callback
-        def detection_callback(frame):
-            amplitude = frame['amplitude']
+        self._stats_event.clear()
+        self._last_display = 0.0
+        self._last_stats = 0
+        self._latest_plot = None
 
-            # Detect presence
-            is_present, confidence, variance = self.presence_detector.detect(amplitude)
+        # Frames arrive in blocks, one per serial read, as the same per-frame
+        # magnitude calibration used (int32 |h|^2 from the raw values when
+        # use_magnitude_squared is set)
+        self.collector.add_sink(self, self.preprocessor.frame_magnitude)
 
-            # Display result
-            status = "PRESENCE DETECTED" if is_present else "No presence      "
-            bar_len = int(confidence * 20)
-            bar = '\u2588' * bar_len + '\u2591' * (20 - bar_len)
-
-            print(f"\r{status} | Conf: [{bar}] {confidence:.2f} | Var: {variance:8.1f} | RSSI: {frame['rssi']:4d} dBm", end='')
-
-            # Update visualization
-            if live_viz:
-                live_viz.update(
-                    amplitude,
-                    variance,
-                    is_present,
-                    self.presence_detector.variance_threshold
-                )
+        # Start collection
+        self.collector.start_collection()
 
-        self.collector.add_callback(detection_callback)
+        # Plotting stays on this thread (matplotlib isn't thread safe), at
+        # most once per DISPLAY_INTERVAL with the newest values from on_batch
+        wait_timeout = self.DISPLAY_INTERVAL if self._live_viz else 1.0
 
         try:
             while True:
-                time.sleep(0.1)
+                # Woken by the collector thread every STATS_INTERVAL frames; the
+                # timeout keeps Ctrl+C responsive (Windows can't interrupt a wait)
+                # and paces the live plot
+                stats_due = self._stats_event.wait(timeout=wait_timeout)
+
+                latest, self._latest_plot = self._latest_plot, None
+                if latest is not None:
+                    self._live_viz.update(*latest)
+
+                if not stats_due:
+                    continue
+                self._stats_event.clear()
 
-                # Print statistics periodically
                 stats = self.collector.get_statistics()
-                if stats['packets_parsed'] > 0 and stats['packets_parsed'] % 1000 == 0:
-                    print(f"\n[Stats] {stats['parse_rate']:.1f} fps, buffer: {stats['buffer_size']}")
+                print(f"\n[Stats] {stats['parse_rate']:.1f} fps, buffer: {stats['buffer_size']}")
 
         except KeyboardInterrupt:
             print("\n\nStopping detection...")
         finally:
             self.collector.stop_collection()
+            self.collector.remove_sink(self)
             self.collector.disconnect()
-            if live_viz:
-                live_viz.close()
+            if self._live_viz:
+                self._live_viz.close()
+
+    def on_batch(self, amp_block: np.ndarray):
+        """
+        Run detection on a block of new frames (collector sink).
+
+        Args:
+            amp_block: Magnitudes of the new frames (see CSIPreprocessor.frame_magnitude),
+                       shape (n_frames, n_subcarriers)
+        """
+        if self.collector.packets_parsed - self._last_stats >= self.STATS_INTERVAL:
+            self._last_stats = self.collector.packets_parsed
+            self._stats_event.set()
+
+        # Detect presence: one mean per frame and one window update per block
+        is_present, confidence, variance = self.presence_detector.detect_batch(amp_block)
+
+        # Display result (terminal output costs more than detection at high frame rates)
+        now = time.monotonic()
+        if now - self._last_display >= self.DISPLAY_INTERVAL:
+            self._last_display = now
+            status = "PRESENCE DETECTED" if is_present else "No presence      "
+            bar = self.BARS[int(confidence * 20)]
+            rssi = int(self.collector.get_recent_rssi(1)[-1])
+
+            print(f"\r{status} | Conf: [{bar}] {confidence:.2f} | Var: {variance:8.1f} | RSSI: {rssi:4d} dBm", end='')
+
+        # Hand the latest frame to run() for the live plot
+        if self._live_viz:
+            self._latest_plot = (
+                amp_block[-1],
+                variance,
+                is_present,
+                self.presence_detector.variance_threshold
+            )
 
     def test_connection(self) -> bool:
         """Test if ESP32 is sending CSI data."""
@@ -206,6 +280,16 @@ def main():
         default=50.0,
         help='Manual variance threshold (default: 50.0, ignored if --calibrate)'
     )
+    parser.add_argument(
+        '--binary',
+        action='store_true',
+        help='ESP32 sends binary CSI frames (see firmware/README.md)'
+    )
+    parser.add_argument(
+        '--magnitude-squared',
+        action='store_true',
+        help='Detect on squared amplitude, skipping the sqrt (use with --calibrate)'
+    )
 
     args = parser.parse_args()
 
@@ -215,7 +299,12 @@ def main():
     print(f"Baud rate: {args.baud}")
     print(f"=" * 40)
 
-    detector = LiveDetector(args.port, args.baud)
+    detector = LiveDetector(
+        args.port,
+        args.baud,
+        binary=args.binary,
+        use_magnitude_squared=args.magnitude_squared
+    )
 
     if args.test:
         success = detector.test_connection()
@@ -2,7 +2,7 @@
 """
 Activity Classification Model Training Script
 
-Trains a Random Forest classifier on labeled CSI data.
+Trains a gradient boosted tree (or Random Forest) classifier on labeled CSI data.
 
 Expected data directory structure:
     data/labeled/
@@ -16,6 +16,9 @@ Expected data directory structure:
         large_movement/
             recording1.csv
 
+Recordings can also be .npz files (collect_data.py --output x.npz), which
+load without any text parsing.
+
 Usage:
     python train_model.py --data data/labeled --output models/activity_classifier.pkl
 """
@@ -24,8 +27,10 @@ import sys
 import os
 import argparse
 import numpy as np
+from joblib import Memory
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.inspection import permutation_importance
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -34,7 +39,50 @@ from parser import CSIParser
 from detector import ActivityClassifier, CSIPreprocessor, create_windows
 
 
-def load_labeled_data(data_dir: str, window_size: int = 100, stride: int = 50):
+# Part of the preprocessing cache key: bump whenever CSIParser or
+# CSIPreprocessor changes what they produce, so cached recordings from
+# older code are not reused
+PREPROCESS_VERSION = 1
+
+
+def load_recording(
+    filepath: str,
+    mtime: float,
+    preprocess_params: dict,
+    version: int = PREPROCESS_VERSION
+):
+    """
+    Parse and preprocess one recording.
+
+    Args:
+        filepath: Path to CSV or .npz recording
+        mtime: File modification time (only part of the cache key, so
+               edited recordings are reprocessed)
+        preprocess_params: CSIPreprocessor keyword arguments
+        version: Preprocessing version (only part of the cache key)
+
+    Returns:
+        Preprocessed amplitudes of shape (n_frames, n_subcarriers),
+        or None if the file has no valid data
+    """
+    csi_parser = CSIParser()
+    csi_parser.load_file(filepath)
+    amplitudes = csi_parser.get_amplitudes()
+
+    if len(amplitudes) == 0:
+        return None
+
+    # Preprocess
+    return CSIPreprocessor(**preprocess_params).preprocess(amplitudes)
+
+
+def load_labeled_data(
+    data_dir: str,
+    window_size: int = 100,
+    stride: int = 50,
+    cache_dir: str = None,
+    preprocess_params: dict = None
+):
     """
     Load and prepare labeled training data.
 
@@ -42,15 +90,24 @@ def load_labeled_data(data_dir: str, window_size: int = 100, stride: int = 50):
         data_dir: Path to labeled data directory
         window_size: Frames per window
         stride: Step between windows
+        cache_dir: Optional directory to cache preprocessed recordings in,
+                   so repeated training runs skip parsing and filtering.
+                   Off by default; entries are keyed on the file, its
+                   mtime and PREPROCESS_VERSION, so bump that constant
+                   when changing parsing or preprocessing code
+        preprocess_params: Optional CSIPreprocessor keyword arguments
+                           (also part of the cache key)
 
     Returns:
-        Tuple of (X_windows, y_labels)
+        Tuple of (X_windows, y_labels) arrays, X_windows shaped
+        (n_windows, window_size, n_subcarriers)
     """
     X_windows = []
     y_labels = []
+    files_by_width = {}  # Subcarrier count -> recordings with it
 
-    preprocessor = CSIPreprocessor()
-    csi_parser = CSIParser()
+    load = Memory(cache_dir or None, verbose=0).cache(load_recording)
+    preprocess_params = dict(preprocess_params or {})
 
     for label in ActivityClassifier.CLASSES:
         label_dir = os.path.join(data_dir, label)
@@ -59,41 +116,54 @@ def load_labeled_data(data_dir: str, window_size: int = 100, stride: int = 50):
             print(f"Warning: Directory not found: {label_dir}")
             continue
 
-        csv_files = [f for f in os.listdir(label_dir) if f.endswith('.csv')]
+        recordings = [f for f in os.listdir(label_dir) if f.endswith(('.csv', '.npz'))]
 
-        if not csv_files:
-            print(f"Warning: No CSV files in {label_dir}")
+        if not recordings:
+            print(f"Warning: No CSV or .npz files in {label_dir}")
             continue
 
         print(f"\nLoading '{label}' data:")
 
-        for filename in csv_files:
+        for filename in recordings:
             filepath = os.path.join(label_dir, filename)
             print(f"  - {filename}...", end='')
 
             try:
-                frames = csi_parser.load_file(filepath)
-                amplitudes = csi_parser.get_amplitudes()
+                amplitudes = load(
+                    filepath, os.path.getmtime(filepath), preprocess_params, PREPROCESS_VERSION
+                )
 
-                if len(amplitudes) == 0:
+                if amplitudes is None:
                     print(" (no valid data)")
                     continue
 
-                # Preprocess
-                amplitudes = preprocessor.preprocess(amplitudes)
-
-                # Create windows
+                # Windows are a strided view of the (cached) amplitudes; caching
+                # the amplitudes rather than the windows stores each frame once
                 windows = create_windows(amplitudes, window_size, stride)
 
-                X_windows.extend(windows)
-                y_labels.extend([label] * len(windows))
+                X_windows.append(windows)
+                y_labels.append(np.full(len(windows), label))
+                files_by_width.setdefault(windows.shape[2], []).append(filepath)
 
                 print(f" {len(windows)} windows")
 
             except Exception as e:
                 print(f" ERROR: {e}")
 
-    return X_windows, y_labels
+    if not X_windows:
+        return np.empty((0, window_size, 0), dtype=np.float32), np.empty(0, dtype=str)
+
+    if len(files_by_width) > 1:
+        details = '; '.join(
+            f"{width} subcarriers: {', '.join(files)}" for width, files in sorted(files_by_width.items())
+        )
+        raise ValueError(
+            f"Recordings have different subcarrier counts ({details}). "
+            "Train on recordings from one device/bandwidth setting."
+        )
+
+    # Single copy of all windows instead of one small array per window
+    return np.concatenate(X_windows), np.concatenate(y_labels)
 
 
 def main():
@@ -134,6 +204,17 @@ def main():
         default=5,
         help='Cross-validation folds (default: 5)'
     )
+    parser.add_argument(
+        '--cache-dir',
+        default=None,
+        help='Cache preprocessed recordings in this directory (default: off)'
+    )
+    parser.add_argument(
+        '--model',
+        choices=['hist_gradient_boosting', 'random_forest'],
+        default='hist_gradient_boosting',
+        help='Classifier type (default: hist_gradient_boosting)'
+    )
 
     args = parser.parse_args()
 
@@ -142,11 +223,16 @@ def main():
 
     # Load data
     print(f"\nLoading data from: {args.data}")
-    X_windows, y_labels = load_labeled_data(
-        args.data,
-        window_size=args.window_size,
-        stride=args.stride
-    )
+    try:
+        X_windows, y_labels = load_labeled_data(
+            args.data,
+            window_size=args.window_size,
+            stride=args.stride,
+            cache_dir=args.cache_dir
+        )
+    except ValueError as e:
+        print(f"\nError: {e}")
+        sys.exit(1)
 
     if len(X_windows) == 0:
         print("\nNo training data found!")
@@ -163,47 +249,44 @@ def main():
     for label, count in zip(unique, counts):
         print(f"  {label}: {count} ({100 * count / len(y_labels):.1f}%)")
 
+    # Extract features once - reused for training, cross-validation and testing
+    classifier = ActivityClassifier(model_type=args.model)
+    print("\nExtracting features...")
+    features = classifier.feature_extractor.extract_features_batch(X_windows)
+
     # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X_windows, y_labels,
+    train_idx, test_idx = train_test_split(
+        np.arange(len(X_windows)),
         test_size=args.test_split,
         random_state=42,
         stratify=y_labels
     )
+    y_train, y_test = y_labels[train_idx], y_labels[test_idx]
 
-    print(f"\nTraining set: {len(X_train)} samples")
-    print(f"Test set: {len(X_test)} samples")
+    print(f"\nTraining set: {len(train_idx)} samples")
+    print(f"Test set: {len(test_idx)} samples")
 
     # Train model
-    print("\nTraining Random Forest classifier...")
-    classifier = ActivityClassifier()
-    classifier.train(X_train, y_train)
+    print(f"\nTraining {args.model} classifier...")
+    classifier.train_precomputed(features[train_idx], y_train)
 
-    # Cross-validation
+    # Cross-validation on the already extracted training features. Folds run
+    # in parallel processes, which already use every core, so each clone fits
+    # on one thread (train_precomputed leaves the Random Forest's n_jobs unset).
     print(f"\n{args.cv_folds}-fold cross-validation...")
-    from sklearn.ensemble import RandomForestClassifier
-    from sklearn.pipeline import make_pipeline
-
-    # Extract features for CV
-    features_train = np.array([
-        classifier.feature_extractor.extract_features(w) for w in X_train
-    ])
-    features_scaled = classifier.scaler.transform(features_train)
 
     cv_scores = cross_val_score(
         classifier.model,
-        features_scaled,
+        features[train_idx],
         y_train,
-        cv=args.cv_folds
+        cv=args.cv_folds,
+        n_jobs=-1
     )
     print(f"CV Accuracy: {cv_scores.mean():.3f} (+/- {cv_scores.std() * 2:.3f})")
 
     # Test set evaluation
     print("\nTest set evaluation:")
-    y_pred = []
-    for window in X_test:
-        pred, _ = classifier.predict(window)
-        y_pred.append(pred)
+    y_pred = classifier.predict_precomputed(features[test_idx])
 
     print("\nClassification Report:")
     print(classification_report(y_test, y_pred))
@@ -223,7 +306,13 @@ def main():
     # Feature importance
     print("\nFeature Importance:")
     feature_names = classifier.feature_extractor.get_feature_names()
-    importances = classifier.model.feature_importances_
+    if hasattr(classifier.model, 'feature_importances_'):
+        importances = classifier.model.feature_importances_
+    else:
+        # Gradient boosting has no impurity importances, measure on the test set
+        importances = permutation_importance(
+            classifier.model, features[test_idx], y_test, n_repeats=5, random_state=42
+        ).importances_mean
     sorted_idx = np.argsort(importances)[::-1]
     for idx in sorted_idx[:5]:
         print(f"  {feature_names[idx]}: {importances[idx]:.3f}")
@@ -2,47 +2,161 @@
 Simple WiFi CSI Human Detection
 No complex imports - standalone script
 """
+import queue
 import serial
+import threading
 import time
 import numpy as np
-from collections import deque
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to plain NumPy
+    njit = None
 
 # Configuration
 PORT = 'COM5'
 BAUD_RATE = 921600
 WINDOW_SIZE = 100
 THRESHOLD_MULTIPLIER = 3.0
+BATCH_SIZE = 32       # Max CSI lines parsed together
+BATCH_TIMEOUT = 0.01  # Max seconds a line waits for its batch
+QUEUE_SIZE = 100      # Max parsed batches waiting to be processed
+USE_MAGNITUDE_SQUARED = False  # Detect on |h|^2 (no sqrt); variance scale differs
+DISPLAY_INTERVAL = 1 / 30  # Max status line refresh rate (seconds)
+
+# Characters wrapping the CSI array in esp-csi output ("[...]"), stripped
+# before tokenizing so the first and last values aren't lost (a per-value
+# isdigit check dropped "[4" and "6]", shifting every (imag, real) pair)
+_CSI_STRIP = str.maketrans('', '', '[]"')
+
+# Confidence bars for 0..20 filled cells
+_BARS = tuple('█' * n + '░' * (20 - n) for n in range(21))
+
+def _csi_amplitude(raw):
+    """Amplitude of (imag, real) pairs, skipping the first 2 (invalid)."""
+    pairs = raw[:len(raw) // 2 * 2].reshape(-1, 2)
+    amp = np.hypot(pairs[:, 1], pairs[:, 0], dtype=np.float32)
+    return amp[2:] if len(amp) > 2 else amp
+
+if njit is not None:
+    # Compiled at import without cache=True, like the src/parser.py kernels
+    @njit(fastmath=True)
+    def _csi_amplitude(raw):
+        n = len(raw) // 2
+        start = 2 if n > 2 else 0
+        amp = np.empty(n - start, dtype=np.float32)
+        for i in range(start, n):
+            imag = np.float32(raw[2 * i])
+            real = np.float32(raw[2 * i + 1])
+            amp[i - start] = np.sqrt(real * real + imag * imag)
+        return amp
+
+    _csi_amplitude(np.zeros(128, dtype=np.int16))  # Compile up front, not on the first frame
+
+def _csi_power(raw):
+    """Squared amplitude |h|^2 in integer math, skipping the first 2 (invalid)."""
+    pairs = raw[:len(raw) // 2 * 2].reshape(-1, 2).astype(np.int32)
+    power = pairs[:, 0] * pairs[:, 0] + pairs[:, 1] * pairs[:, 1]
+    return power[2:] if len(power) > 2 else power
+
+def _parse_rssi(field):
+    """RSSI field as an int, 0 if malformed."""
+    try:
+        return int(field)
+    except ValueError:
+        return 0
 
 def parse_csi_line(line):
     """Parse CSI_DATA line and extract amplitude."""
     try:
-        parts = line.split(',')
-        if len(parts) < 26:
+        parts = line.split(',', 24)
+        if len(parts) < 25:
             return None
 
-        rssi = int(parts[3]) if parts[3].lstrip('-').isdigit() else 0
+        rssi = _parse_rssi(parts[3])
 
-        # Extract raw CSI data (starts around index 24-25)
-        raw_data = []
-        for x in parts[24:]:
-            x_clean = x.strip()
-            if x_clean and x_clean.lstrip('-').isdigit():
-                raw_data.append(int(x_clean))
+        # Raw CSI data starts at index 24 - tokenize it in one C call
+        raw = np.fromstring(parts[24].translate(_CSI_STRIP), sep=',', dtype=np.int16)
 
-        # Convert to amplitude (magnitude of complex pairs)
-        amplitudes = []
-        for i in range(0, len(raw_data) - 1, 2):
-            imag, real = raw_data[i], raw_data[i + 1]
-            amp = np.sqrt(real**2 + imag**2)
-            amplitudes.append(amp)
+        magnitude = _csi_power(raw) if USE_MAGNITUDE_SQUARED else _csi_amplitude(raw)
+        return {'rssi': rssi, 'amplitude': magnitude}
+    except:
+        return None
 
-        if len(amplitudes) > 2:
-            amplitudes = amplitudes[2:]  # Skip first 2 (invalid)
+def parse_csi_batch(lines):
+    """
+    Parse several CSI_DATA lines with one np.fromstring call.
 
-        return {'rssi': rssi, 'amplitude': np.array(amplitudes)}
-    except:
+    Returns (rssi, amplitudes) arrays with one row per frame, or None if
+    the frames don't share the same layout.
+    """
+    rssi = []
+    tails = []
+    for line in lines:
+        parts = line.split(',', 24)
+        if len(parts) < 25:
+            continue
+        rssi.append(_parse_rssi(parts[3]))
+        tails.append(parts[24].translate(_CSI_STRIP).strip(', '))
+
+    if not tails or len({t.count(',') for t in tails}) != 1:
+        return None
+
+    n_values = tails[0].count(',') + 1
+    raw = np.fromstring(','.join(tails), sep=',', dtype=np.int16)
+    if n_values < 2 or raw.size != len(tails) * n_values:
         return None
 
+    raw = raw.reshape(len(tails), n_values)
+    n = n_values // 2
+    if USE_MAGNITUDE_SQUARED:
+        imag = raw[:, 0:2 * n:2].astype(np.int32)
+        real = raw[:, 1:2 * n:2].astype(np.int32)
+        amplitudes = real * real + imag * imag
+    else:
+        amplitudes = np.hypot(raw[:, 1:2 * n:2], raw[:, 0:2 * n:2], dtype=np.float32)
+    if n > 2:
+        amplitudes = amplitudes[:, 2:]
+    return np.array(rssi), amplitudes
+
+def serial_reader(ser, batches, stop):
+    """Read CSI_DATA lines on a background thread and queue parsed batches."""
+    partial = b''  # Incomplete last line, finished by the next read
+    batch = []
+    batch_start = 0.0
+    while not stop.is_set():
+        try:
+            # Whatever is buffered in one call; only waits for the first byte
+            data = ser.read(max(1, ser.in_waiting))
+        except (serial.SerialException, OSError, ValueError):
+            break
+        if data:
+            lines = (partial + data).split(b'\n')
+            partial = lines.pop()
+            for raw in lines:
+                line = raw.decode('utf-8', errors='ignore').strip()
+                if line.startswith('CSI_DATA'):
+                    if not batch:
+                        batch_start = time.monotonic()
+                    batch.append(line)
+
+        if batch and (len(batch) >= BATCH_SIZE or time.monotonic() - batch_start >= BATCH_TIMEOUT):
+            try:
+                block = parse_csi_batch(batch)
+                if block is None:
+                    # Mixed layouts - fall back to one frame per block
+                    for line in batch:
+                        parsed = parse_csi_line(line)
+                        if parsed and len(parsed['amplitude']) > 0:
+                            batches.put_nowait((np.array([parsed['rssi']]), parsed['amplitude'][np.newaxis]))
+                else:
+                    batches.put_nowait(block)
+            except queue.Full:
+                pass  # Consumer is behind, drop the batch
+            except Exception:
+                pass
+            batch = []
+
 def main():
     print("=" * 50)
     print("WiFiVision - Simple CSI Human Detection")
@@ -54,7 +168,7 @@ def main():
     # Connect
     print("Connecting to ESP32...")
     try:
-        ser = serial.Serial(PORT, BAUD_RATE, timeout=1)
+        ser = serial.Serial(PORT, BAUD_RATE, timeout=BATCH_TIMEOUT)  # Short, so a quiet port still flushes partial batches
         time.sleep(2)
         ser.flushInput()
         print("Connected!")
@@ -80,34 +194,48 @@ def main():
     time.sleep(1)
     print("Collecting baseline...")
 
-    baseline_amplitudes = []
+    # Serial I/O and parsing run on their own thread so the port never stalls
+    batches = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+    ser.flushInput()
+    reader_thread = threading.Thread(target=serial_reader, args=(ser, batches, stop), daemon=True)
+    reader_thread.start()
+
+    # Streaming mean/variance of the mean amplitude, merged batch by batch (Chan et al.)
+    n_samples = 0
+    baseline_mean = 0.0
+    baseline_m2 = 0.0
     start_time = time.time()
 
     while time.time() - start_time < 10:
-        if ser.in_waiting:
-            try:
-                line = ser.readline().decode('utf-8', errors='ignore').strip()
-                if line.startswith('CSI_DATA'):
-                    parsed = parse_csi_line(line)
-                    if parsed and len(parsed['amplitude']) > 0:
-                        baseline_amplitudes.append(np.mean(parsed['amplitude']))
-                        print(f"\r  Samples: {len(baseline_amplitudes)}", end='')
-            except:
-                pass
+        try:
+            rssi, amplitudes = batches.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if amplitudes.shape[1] > 0:
+            samples = amplitudes.mean(axis=1, dtype=np.float64)
+            batch_mean = float(samples.mean())
+            delta = batch_mean - baseline_mean
+            total = n_samples + len(samples)
+            baseline_mean += delta * len(samples) / total
+            baseline_m2 += float(np.square(samples - batch_mean).sum()) + delta * delta * n_samples * len(samples) / total
+            n_samples = total
+            print(f"\r  Samples: {n_samples}", end='')
 
     print()
 
-    if len(baseline_amplitudes) < 100:
-        print(f"WARNING: Only got {len(baseline_amplitudes)} samples (expected 500+)")
+    if n_samples < 100:
+        print(f"WARNING: Only got {n_samples} samples (expected 500+)")
         print("The ESP32 may not be sending CSI data.")
         print("\nCheck in ESP-IDF CMD:")
         print("  idf.py -p COM5 monitor")
         print("Do you see CSI_DATA lines?")
-        if len(baseline_amplitudes) == 0:
+        if n_samples == 0:
+            stop.set()
             ser.close()
             return
 
-    baseline_var = np.var(baseline_amplitudes)
+    baseline_var = baseline_m2 / n_samples
     threshold = baseline_var * THRESHOLD_MULTIPLIER
     print(f"Baseline variance: {baseline_var:.2f}")
     print(f"Detection threshold: {threshold:.2f}")
@@ -120,36 +248,62 @@ def main():
     print("=" * 50)
     print()
 
-    buffer = deque(maxlen=WINDOW_SIZE)
+    # Ring buffer with running sums: O(1) variance per frame
+    buffer = np.zeros(WINDOW_SIZE, dtype=np.float32)
+    head = 0
+    count = 0
+    total = 0.0
+    total_sq = 0.0
+    last_display = 0.0
 
     try:
         while True:
-            if ser.in_waiting:
-                try:
-                    line = ser.readline().decode('utf-8', errors='ignore').strip()
-                    if line.startswith('CSI_DATA'):
-                        parsed = parse_csi_line(line)
-                        if parsed and len(parsed['amplitude']) > 0:
-                            mean_amp = np.mean(parsed['amplitude'])
-                            buffer.append(mean_amp)
+            # Timeout keeps Ctrl+C responsive while waiting for data
+            try:
+                rssi, amplitudes = batches.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if amplitudes.shape[1] == 0:
+                continue
+
+            for mean_amp, frame_rssi in zip(amplitudes.mean(axis=1).tolist(), rssi.tolist()):
+                if count == WINDOW_SIZE:
+                    old = float(buffer[head])
+                    total -= old
+                    total_sq -= old * old
+                else:
+                    count += 1
+                buffer[head] = mean_amp
+                mean_amp = float(buffer[head])  # Accumulate the value actually stored
+                total += mean_amp
+                total_sq += mean_amp * mean_amp
+                head = (head + 1) % WINDOW_SIZE
+
+                # Re-sum once per wrap so rounding errors don't accumulate
+                if head == 0:
+                    window = buffer.astype(np.float64)
+                    total = float(window.sum())
+                    total_sq = float(np.dot(window, window))
 
-                            if len(buffer) >= WINDOW_SIZE // 2:
-                                current_var = np.var(list(buffer))
-                                is_present = current_var > threshold
-                                confidence = min(1.0, current_var / (threshold * 2))
+            # Refresh the status line for the latest frame, at most DISPLAY_INTERVAL often
+            now = time.monotonic()
+            if count >= WINDOW_SIZE // 2 and now - last_display >= DISPLAY_INTERVAL:
+                last_display = now
+                mean = total / count
+                current_var = max(total_sq / count - mean * mean, 0.0)
+                is_present = current_var > threshold
+                confidence = min(1.0, current_var / (threshold * 2))
 
-                                # Visual display
-                                status = "PRESENCE!" if is_present else "Empty    "
-                                bar_len = int(confidence * 20)
-                                bar = '█' * bar_len + '░' * (20 - bar_len)
+                # Visual display
+                status = "PRESENCE!" if is_present else "Empty    "
+                bar = _BARS[int(confidence * 20)]
 
-                                print(f"\r{status} [{bar}] Var:{current_var:8.1f} RSSI:{parsed['rssi']:4d}dBm", end='')
-                except:
-                    pass
+                print(f"\r{status} [{bar}] Var:{current_var:8.1f} RSSI:{frame_rssi:4d}dBm", end='')
 
     except KeyboardInterrupt:
         print("\n\nStopped!")
     finally:
+        stop.set()
         ser.close()
         print("Disconnected from ESP32")
 
@@ -7,15 +7,19 @@ Camera-free human detection using WiFi Channel State Information.
 __version__ = "0.1.0"
 __author__ = "Akhil Reddy"
 
-from .parser import CSIParser, parse_csi_line
-from .collector import CSICollector
+from .parser import CSIParser, parse_csi_line, parse_csi_lines, save_npz, convert_csv_to_npz
+from .collector import CSICollector, FrameSink
 from .detector import PresenceDetector, ActivityClassifier, CSIPreprocessor
 from .visualizer import CSIVisualizer
 
 __all__ = [
     "CSIParser",
     "parse_csi_line",
+    "parse_csi_lines",
+    "save_npz",
+    "convert_csv_to_npz",
     "CSICollector",
+    "FrameSink",
     "PresenceDetector",
     "ActivityClassifier",
     "CSIPreprocessor",
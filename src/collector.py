@@ -5,14 +5,60 @@ Collects CSI data from ESP32 serial port.
 """
 
 import serial
-import csv
 import time
 import threading
+import numpy as np
 from datetime import datetime
-from typing import Optional, Callable, List
+from typing import Optional, Callable, List, Tuple, Protocol
 from collections import deque
 
-from .parser import parse_csi_line
+from .parser import parse_csi_lines, parse_binary_frames, format_csi_line, save_npz
+
+
+class FrameSink(Protocol):
+    """
+    Receiver for blocks of frames from background collection.
+
+    Unlike callbacks, which get one frame dict at a time, a sink gets all
+    frames from a serial read at once as rows of an array: amplitudes by
+    default, or the per-frame values chosen in add_sink.
+    """
+
+    def on_batch(self, amp_block: np.ndarray):
+        """
+        Process newly collected frames.
+
+        Args:
+            amp_block: Per-frame values, shape (n_frames, n_subcarriers),
+                       oldest first. Holds every frame of the read, even
+                       more than the collector's buffer_size. If the
+                       subcarrier layout changes within a read, each
+                       layout arrives as its own block.
+        """
+        ...
+
+
+def _iso_timestamps(timestamps_ns) -> List[str]:
+    """
+    Format time.time_ns() values as ISO strings.
+
+    Frames from one serial read share a timestamp, so each distinct value
+    is only formatted once.
+    """
+    formatted = {}
+    result = []
+    for ns in timestamps_ns:
+        text = formatted.get(ns)
+        if text is None:
+            text = formatted[ns] = datetime.fromtimestamp(ns / 1e9).isoformat()
+        result.append(text)
+    return result
+
+
+def _add_iso_timestamps(frames: List[dict]):
+    """Set each frame's 'timestamp' from its 'timestamp_ns'."""
+    for frame, text in zip(frames, _iso_timestamps([frame['timestamp_ns'] for frame in frames])):
+        frame['timestamp'] = text
 
 
 class CSICollector:
@@ -27,7 +73,8 @@ class CSICollector:
         self,
         port: str = "COM3",
         baud_rate: int = 921600,
-        buffer_size: int = 1000
+        buffer_size: int = 1000,
+        binary: bool = False
     ):
         """
         Initialize CSI collector.
@@ -36,16 +83,35 @@ class CSICollector:
             port: Serial port (e.g., 'COM3' on Windows, '/dev/ttyUSB0' on Linux)
             baud_rate: Serial baud rate (921600 recommended for high sampling)
             buffer_size: Size of frame buffer for real-time collection
+            binary: Expect binary CSI frames instead of ASCII CSI_DATA lines
+                    (see firmware/README.md)
         """
         self.port = port
         self.baud_rate = baud_rate
         self.buffer_size = buffer_size
+        self.binary = binary
+        self._rx_buffer = bytearray()
+
+        # Frames handed back through release_frame, reused by the ASCII parser
+        self._frame_pool: deque = deque(maxlen=buffer_size)
 
         self.serial: Optional[serial.Serial] = None
-        self.buffer: deque = deque(maxlen=buffer_size)
         self.is_collecting = False
         self._collection_thread: Optional[threading.Thread] = None
         self._callbacks: List[Callable] = []
+        self._sinks: List[Tuple[FrameSink, Optional[Callable]]] = []
+
+        # Recent frames for real-time use, stored column-wise in ring buffers
+        # (amplitude/phase rings are sized on the first frame)
+        self._amplitude_ring: Optional[np.ndarray] = None
+        self._phase_ring: Optional[np.ndarray] = None
+        self._rssi_ring = np.zeros(buffer_size, dtype=np.int16)
+        self._timestamp_ring = np.zeros(buffer_size, dtype=np.int64)  # time.time_ns()
+        # The frame dicts themselves, for their metadata (their arrays
+        # may be recycled once released, so the rings hold the copies)
+        self._frame_ring: List[Optional[dict]] = [None] * buffer_size
+        self._ring_head = 0
+        self._ring_count = 0
 
         # Statistics
         self.packets_received = 0
@@ -67,6 +133,7 @@ class CSICollector:
             )
             time.sleep(2)  # Wait for connection to stabilize
             self.serial.flushInput()
+            self._rx_buffer.clear()
             print(f"Connected to {self.port} at {self.baud_rate} baud")
             return True
         except serial.SerialException as e:
@@ -93,19 +160,49 @@ class CSICollector:
         if callback in self._callbacks:
             self._callbacks.remove(callback)
 
+    def add_sink(self, sink: FrameSink, values: Optional[Callable] = None):
+        """
+        Add a sink for batched real-time processing.
+
+        Sinks are only fed by background collection (start_collection).
+
+        Args:
+            sink: Receiver of the frame blocks
+            values: Optional function mapping a parsed frame to the 1D row
+                    the sink gets for it (e.g. CSIPreprocessor.frame_magnitude);
+                    the frame's amplitude by default
+        """
+        self._sinks.append((sink, values))
+
+    def remove_sink(self, sink: FrameSink):
+        """Remove a sink."""
+        self._sinks = [entry for entry in self._sinks if entry[0] is not sink]
+
     def collect_blocking(
         self,
         duration_seconds: float,
         output_file: Optional[str] = None,
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        keep_frames: bool = True
     ) -> List[dict]:
         """
         Collect CSI data for specified duration (blocking).
 
         Args:
             duration_seconds: Collection duration
-            output_file: Optional CSV file to save data
+            output_file: Optional file to save data: CSV with the raw lines, or
+                         a NumPy recording if it ends in .npz (see
+                         CSIParser.load_npz; frames whose subcarrier count
+                         differs from the first frame's are left out)
             progress_callback: Optional callback(packets, elapsed) for progress
+            keep_frames: If False, frames only go to callbacks and the output
+                         file, and an empty list is returned. Frames are then
+                         recycled once the callbacks return, so callbacks
+                         must copy anything they want to keep.
+
+        Callbacks get the arrival time as 'timestamp_ns' (time.time_ns());
+        the ISO 'timestamp' strings are only formatted for the output file
+        and the returned frames.
 
         Returns:
             List of collected CSI frames
@@ -119,48 +216,66 @@ class CSICollector:
         self.packets_parsed = 0
         self.start_time = time.time()
 
-        # Prepare output file if specified
-        csv_writer = None
+        # Prepare output file if specified. Rows are formatted by hand (same
+        # bytes csv.writer produces) and written through a 1 MB buffer.
         csv_file = None
-        if output_file:
-            csv_file = open(output_file, 'w', newline='')
-            csv_writer = csv.writer(csv_file)
-            csv_writer.writerow(['timestamp', 'raw_line'])
+        npz_frames = None
+        if output_file and output_file.endswith('.npz'):
+            npz_frames = []
+        elif output_file:
+            csv_file = open(output_file, 'wb', buffering=1 << 20)
+            csv_file.write(b'timestamp,raw_line\r\n')
 
         try:
             print(f"Collecting CSI data for {duration_seconds} seconds...")
 
             while (time.time() - self.start_time) < duration_seconds:
-                if self.serial.in_waiting:
-                    try:
-                        line = self.serial.readline().decode('utf-8', errors='ignore').strip()
-                        self.packets_received += 1
-
-                        if line.startswith('CSI_DATA'):
-                            timestamp = datetime.now().isoformat()
-
-                            # Save to file
-                            if csv_writer:
-                                csv_writer.writerow([timestamp, line])
-
-                            # Parse frame
-                            parsed = parse_csi_line(line)
-                            if parsed and len(parsed.get('amplitude', [])) > 0:
-                                parsed['timestamp'] = timestamp
+                try:
+                    # Frames from one read arrived together, so they share a timestamp
+                    read = self._read_frames()
+                    if not read:
+                        continue
+                    now_ns = time.time_ns()
+                    if csv_file:
+                        timestamp = _iso_timestamps([now_ns])[0]
+
+                    for line, parsed in read:
+                        # Save to file (binary frames are stored as CSI_DATA lines)
+                        if csv_file:
+                            raw_line = (line or format_csi_line(parsed)).replace('"', '""')
+                            csv_file.write(f'{timestamp},"{raw_line}"\r\n'.encode('ascii'))
+
+                        if parsed and len(parsed.get('amplitude', [])) > 0:
+                            parsed['timestamp_ns'] = now_ns
+                            if npz_frames is not None and (
+                                not npz_frames
+                                or len(parsed['amplitude']) == len(npz_frames[0]['amplitude'])
+                            ):
+                                # Copies, as parsed frames may be recycled
+                                npz_frames.append({
+                                    'amplitude': parsed['amplitude'].copy(),
+                                    'phase': parsed['phase'].copy(),
+                                    'rssi': parsed['rssi'],
+                                    'timestamp_ns': now_ns,
+                                })
+                            if keep_frames:
                                 frames.append(parsed)
-                                self.packets_parsed += 1
+                            self.packets_parsed += 1
 
-                                # Call callbacks
-                                for callback in self._callbacks:
-                                    callback(parsed)
+                            # Call callbacks
+                            for callback in self._callbacks:
+                                callback(parsed)
 
-                        # Progress callback
-                        if progress_callback and self.packets_parsed % 100 == 0:
-                            elapsed = time.time() - self.start_time
-                            progress_callback(self.packets_parsed, elapsed)
+                            if not keep_frames:
+                                self.release_frame(parsed)
 
-                    except (UnicodeDecodeError, serial.SerialException):
-                        continue
+                    # Progress callback
+                    if progress_callback and self.packets_parsed % 100 == 0:
+                        elapsed = time.time() - self.start_time
+                        progress_callback(self.packets_parsed, elapsed)
+
+                except (UnicodeDecodeError, serial.SerialException):
+                    continue
 
             elapsed = time.time() - self.start_time
             rate = self.packets_parsed / elapsed if elapsed > 0 else 0
@@ -169,7 +284,11 @@ class CSICollector:
         finally:
             if csv_file:
                 csv_file.close()
+            if npz_frames is not None:
+                _add_iso_timestamps(npz_frames)
+                save_npz(output_file, npz_frames)
 
+        _add_iso_timestamps(frames)
         return frames
 
     def start_collection(self):
@@ -201,40 +320,191 @@ class CSICollector:
 
     def _collection_loop(self):
         """Background collection loop."""
-        while self.is_collecting:
-            if self.serial and self.serial.in_waiting:
-                try:
-                    line = self.serial.readline().decode('utf-8', errors='ignore').strip()
-                    self.packets_received += 1
+        while self.is_collecting and self.serial:
+            try:
+                # Frames from one read arrived together, so they share a timestamp
+                read = self._read_frames()
+                if not read:
+                    continue
+                now_ns = time.time_ns()
+
+                # Rows for each sink, taken straight from this read so
+                # none are lost when it holds more frames than the ring
+                sinks = self._sinks
+                sink_rows = [[] for _ in sinks]
+                for line, parsed in read:
+                    if parsed and len(parsed.get('amplitude', [])) > 0:
+                        parsed['timestamp_ns'] = now_ns
+                        self._append_to_ring(parsed, now_ns)
+                        self.packets_parsed += 1
+
+                        for (sink, values), rows in zip(sinks, sink_rows):
+                            row = parsed['amplitude'] if values is None else values(parsed)
+                            if rows and len(rows[0]) != len(row):
+                                self._send_to_sink(sink, rows)
+                                rows.clear()
+                            # Released frames are only reused by the next read,
+                            # after np.stack has copied these rows
+                            rows.append(row)
+
+                        # Call callbacks
+                        for callback in self._callbacks:
+                            try:
+                                callback(parsed)
+                            except Exception as e:
+                                print(f"Callback error: {e}")
+
+                for (sink, _), rows in zip(sinks, sink_rows):
+                    if rows:
+                        self._send_to_sink(sink, rows)
+
+            except (UnicodeDecodeError, serial.SerialException):
+                continue
+
+    def _send_to_sink(self, sink: FrameSink, rows: List[np.ndarray]):
+        """Pass equally sized rows to a sink as one block."""
+        try:
+            sink.on_batch(np.stack(rows))
+        except Exception as e:
+            print(f"Sink error: {e}")
 
-                    if line.startswith('CSI_DATA'):
-                        parsed = parse_csi_line(line)
-                        if parsed and len(parsed.get('amplitude', [])) > 0:
-                            parsed['timestamp'] = datetime.now().isoformat()
-                            self.buffer.append(parsed)
-                            self.packets_parsed += 1
+    def release_frame(self, frame: dict):
+        """
+        Hand back a frame that is no longer used.
 
-                            # Call callbacks
-                            for callback in self._callbacks:
-                                try:
-                                    callback(parsed)
-                                except Exception as e:
-                                    print(f"Callback error: {e}")
+        Its arrays are overwritten by a later frame instead of allocating
+        new ones, so neither the frame nor its arrays may be used after
+        this call. The background collection buffer keeps its own copy,
+        so frames seen by callbacks may be released.
+        """
+        self._frame_pool.append(frame)
 
-                except (UnicodeDecodeError, serial.SerialException):
-                    continue
-            else:
-                time.sleep(0.001)  # Small sleep to prevent CPU spinning
+    def _read_frames(self) -> List[Tuple[Optional[str], Optional[dict]]]:
+        """
+        Read available serial data and parse the CSI frames in it.
+
+        Everything waiting in the driver is read in one call (blocking up
+        to the port timeout when nothing is), and lines are split in C
+        instead of pyserial's byte-at-a-time readline. An incomplete
+        trailing line stays in the receive buffer for the next call.
+        The lines are parsed as one batch (see parse_csi_lines).
+
+        Returns:
+            List of (CSI_DATA line, parsed frame) pairs. The line is None for
+            binary frames; the frame is None if an ASCII line failed to parse.
+        """
+        self._rx_buffer.extend(self.serial.read(max(1, self.serial.in_waiting)))
+
+        if self.binary:
+            frames = parse_binary_frames(self._rx_buffer)
+            self.packets_received += len(frames)
+            return [(None, frame) for frame in frames]
+
+        end = self._rx_buffer.rfind(b'\n')
+        if end < 0:
+            return []
+        raw_lines = bytes(self._rx_buffer[:end]).split(b'\n')
+        del self._rx_buffer[:end + 1]
+        self.packets_received += len(raw_lines)
+
+        # Boot and debug messages are dropped before paying for a decode;
+        # CSI_DATA lines are plain ASCII
+        lines = [
+            raw_line.decode('ascii', errors='ignore').strip()
+            for raw_line in raw_lines
+            if raw_line.startswith(b'CSI_DATA')
+        ]
+        return list(zip(lines, parse_csi_lines(lines, self._frame_pool)))
+
+    def _append_to_ring(self, frame: dict, timestamp_ns: int):
+        """Copy a frame's arrays into the ring buffers."""
+        amplitude = frame['amplitude']
+        if self._amplitude_ring is None or self._amplitude_ring.shape[1] != len(amplitude):
+            # First frame, or the subcarrier layout changed: start over
+            self._amplitude_ring = np.zeros((self.buffer_size, len(amplitude)), dtype=np.float32)
+            self._phase_ring = np.zeros_like(self._amplitude_ring)
+            self._ring_head = 0
+            self._ring_count = 0
+
+        i = self._ring_head
+        self._amplitude_ring[i] = amplitude
+        self._phase_ring[i] = frame['phase']
+        self._rssi_ring[i] = frame['rssi']
+        self._timestamp_ring[i] = timestamp_ns
+        self._frame_ring[i] = frame
+        self._ring_head = (i + 1) % self.buffer_size
+        self._ring_count = min(self._ring_count + 1, self.buffer_size)
+
+    def _recent(self, ring: np.ndarray, n: int) -> np.ndarray:
+        """Last n entries of a ring buffer, oldest first."""
+        n = min(n, self._ring_count)
+        start = self._ring_head - n
+        if start >= 0:
+            return ring[start:self._ring_head]
+        return np.concatenate((ring[start:], ring[:self._ring_head]))
+
+    def get_recent_amplitudes(self, n: int = 100) -> np.ndarray:
+        """
+        Get amplitudes of the n most recent frames.
+
+        Returns:
+            Array of shape (n_frames, n_subcarriers), oldest first. This is a
+            view into the ring buffer unless it wraps around, so copy it if
+            it must outlive the next frames.
+        """
+        if self._amplitude_ring is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._recent(self._amplitude_ring, n)
+
+    def get_recent_phases(self, n: int = 100) -> np.ndarray:
+        """Get phases of the n most recent frames (see get_recent_amplitudes)."""
+        if self._phase_ring is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._recent(self._phase_ring, n)
+
+    def get_recent_rssi(self, n: int = 100) -> np.ndarray:
+        """Get RSSI (dBm) of the n most recent frames (see get_recent_amplitudes)."""
+        return self._recent(self._rssi_ring, n)
+
+    def get_recent_timestamps(self, n: int = 100) -> np.ndarray:
+        """Get arrival times (time.time_ns()) of the n most recent frames (see get_recent_amplitudes)."""
+        return self._recent(self._timestamp_ring, n)
 
     def get_latest_frame(self) -> Optional[dict]:
-        """Get most recent frame from buffer."""
-        if self.buffer:
-            return self.buffer[-1]
-        return None
+        """Get most recent frame from buffer (see get_recent_frames)."""
+        frames = self.get_recent_frames(1)
+        return frames[0] if frames else None
 
     def get_recent_frames(self, n: int = 100) -> List[dict]:
-        """Get n most recent frames from buffer."""
-        return list(self.buffer)[-n:]
+        """
+        Get the n most recent frames from the buffer, oldest first.
+
+        Each frame has all the keys the parser produced, its arrival time
+        as 'timestamp_ns' and an ISO 'timestamp', with its own copies of
+        the amplitude, phase and csi_complex arrays.
+        """
+        if self._amplitude_ring is None:
+            return []
+        amplitudes = self._recent(self._amplitude_ring, n).copy()
+        phases = self._recent(self._phase_ring, n).copy()
+        count = len(amplitudes)
+        timestamps = _iso_timestamps(self._recent(self._timestamp_ring, count).tolist())
+        start = self._ring_head - count
+        if start >= 0:
+            metadata = self._frame_ring[start:self._ring_head]
+        else:
+            metadata = self._frame_ring[start:] + self._frame_ring[:self._ring_head]
+
+        frames = []
+        for i, meta in enumerate(metadata):
+            frame = dict(meta)
+            frame['amplitude'] = amplitudes[i]
+            frame['phase'] = phases[i]
+            frame['timestamp'] = timestamps[i]
+            if 'csi_complex' in frame:
+                frame['csi_complex'] = (amplitudes[i] * np.exp(1j * phases[i])).astype(np.complex64)
+            frames.append(frame)
+        return frames
 
     def get_statistics(self) -> dict:
         """Get collection statistics."""
@@ -244,7 +514,7 @@ class CSICollector:
             'packets_parsed': self.packets_parsed,
             'elapsed_seconds': elapsed,
             'parse_rate': self.packets_parsed / elapsed if elapsed > 0 else 0,
-            'buffer_size': len(self.buffer),
+            'buffer_size': self._ring_count,
             'is_collecting': self.is_collecting,
         }
 
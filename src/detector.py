@@ -8,12 +8,126 @@ using WiFi CSI data.
 import numpy as np
 from scipy import signal
 from scipy.ndimage import uniform_filter1d
-from collections import deque
 import pickle
 from typing import Tuple, Dict, List, Optional
-from sklearn.ensemble import RandomForestClassifier
+from joblib import parallel_backend
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional, fall back to plain NumPy
+    njit = None
+
+
+_HAMPEL_CHUNK = 1024  # Positions per chunk (NumPy) or parallel task (numba)
+
+
+def _hampel_filter(data: np.ndarray, window_size: int, n_sigma: float) -> np.ndarray:
+    """
+    Hampel outlier filter along the first axis of a 2D array.
+
+    Compiled with numba when available; otherwise the medians are computed
+    over a strided view, _HAMPEL_CHUNK positions at a time so the window
+    copies np.median makes stay small however long the recording is.
+    Windows containing NaN have a NaN median, so their values are kept.
+
+    Args:
+        data: Array of shape (n_samples, n_signals), filtered per column
+        window_size: Half-window size for median calculation
+        n_sigma: Number of MAD (median absolute deviation) for threshold
+
+    Returns:
+        Filtered copy of data with outliers replaced by the window median
+    """
+    filtered = np.copy(data)
+    n = len(data)
+    if n <= 2 * window_size:
+        return filtered
+
+    for start in range(window_size, n - window_size, _HAMPEL_CHUNK):
+        stop = min(start + _HAMPEL_CHUNK, n - window_size)
+        windows = np.lib.stride_tricks.sliding_window_view(
+            data[start - window_size:stop + window_size], 2 * window_size + 1, axis=0
+        )
+        median = np.median(windows, axis=-1)
+        mad = np.median(np.abs(windows - median[..., np.newaxis]), axis=-1)
+        threshold = n_sigma * 1.4826 * mad
+
+        center = data[start:stop]
+        filtered[start:stop] = np.where(np.abs(center - median) > threshold, median, center)
+    return filtered
+
+
+if njit is not None:
+    @njit(parallel=True, nogil=True)
+    def _hampel_filter(data: np.ndarray, window_size: int, n_sigma: float) -> np.ndarray:
+        filtered = np.copy(data)
+        n, n_signals = data.shape
+        width = 2 * window_size + 1
+        n_positions = n - 2 * window_size
+        if n_positions <= 0:
+            return filtered
+        n_chunks = (n_positions + _HAMPEL_CHUNK - 1) // _HAMPEL_CHUNK
+
+        for task in prange(n_signals * n_chunks):
+            col = task // n_chunks
+            start = window_size + (task % n_chunks) * _HAMPEL_CHUNK
+            stop = min(start + _HAMPEL_CHUNK, n - window_size)
+
+            # Sorted copy of the current window, updated in O(width) per step.
+            # np.sort puts NaNs last, where the in-place updates never move them
+            window = np.sort(data[start - window_size:start + window_size + 1, col])
+            n_nan = np.count_nonzero(np.isnan(window))
+            for i in range(start, stop):
+                if i > start:
+                    outgoing = data[i - window_size - 1, col]
+                    incoming = data[i + window_size, col]
+                    j = width
+                    if not (np.isnan(outgoing) or np.isnan(incoming)):
+                        j = 0
+                        while j < width and window[j] != outgoing:
+                            j += 1
+                    if j == width:
+                        # A NaN enters or leaves (it can't be found or placed
+                        # by comparison): sort the window again
+                        window = np.sort(data[i - window_size:i + window_size + 1, col])
+                        n_nan = np.count_nonzero(np.isnan(window))
+                    elif incoming > outgoing:
+                        while j + 1 < width and window[j + 1] < incoming:
+                            window[j] = window[j + 1]
+                            j += 1
+                        window[j] = incoming
+                    else:
+                        while j > 0 and window[j - 1] > incoming:
+                            window[j] = window[j - 1]
+                            j -= 1
+                        window[j] = incoming
+
+                # The median of a window with a NaN is NaN, so keep the value
+                if n_nan > 0:
+                    continue
+
+                median = window[window_size]
+
+                # Deviations from the median grow outwards on both sides of
+                # the sorted window, so merge them up to the middle one
+                lo = window_size - 1
+                hi = window_size + 1
+                mad = 0.0
+                for _ in range(window_size):
+                    if hi >= width or (lo >= 0 and median - window[lo] <= window[hi] - median):
+                        mad = median - window[lo]
+                        lo -= 1
+                    else:
+                        mad = window[hi] - median
+                        hi += 1
+
+                if abs(data[i, col] - median) > n_sigma * 1.4826 * mad:
+                    filtered[i, col] = median
+
+        return filtered
+
 
 class CSIPreprocessor:
     """Preprocess raw CSI data for detection."""
@@ -22,7 +136,8 @@ class CSIPreprocessor:
         self,
         sampling_rate: int = 100,
         filter_order: int = 4,
-        cutoff_freq: float = 10.0
+        cutoff_freq: float = 10.0,
+        use_magnitude_squared: bool = False
     ):
         """
         Initialize preprocessor.
@@ -31,15 +146,46 @@ class CSIPreprocessor:
             sampling_rate: Expected CSI sampling rate (Hz)
             filter_order: Butterworth filter order
             cutoff_freq: Lowpass filter cutoff frequency (Hz)
+            use_magnitude_squared: Use |h|^2 instead of |h| in frame_magnitude.
+                                   Enough for variance thresholding and avoids
+                                   the sqrt, but thresholds must be calibrated
+                                   on the same quantity.
         """
         self.sampling_rate = sampling_rate
         self.filter_order = filter_order
         self.cutoff_freq = cutoff_freq
+        self.use_magnitude_squared = use_magnitude_squared
 
         # Design Butterworth lowpass filter
         nyquist = sampling_rate / 2
         normalized_cutoff = min(cutoff_freq / nyquist, 0.99)  # Prevent invalid values
-        self.b, self.a = signal.butter(filter_order, normalized_cutoff, btype='low')
+        # Second-order sections stay stable at higher orders than (b, a)
+        self.sos = signal.butter(filter_order, normalized_cutoff, btype='low', output='sos')
+
+        # float32 copy so filtering doesn't upcast the data to float64
+        self._sos32 = self.sos.astype(np.float32)
+
+    def frame_magnitude(self, frame: Dict) -> np.ndarray:
+        """
+        Get the per-subcarrier magnitude of a parsed CSI frame.
+
+        Args:
+            frame: Parsed CSI frame with 'amplitude' and 'raw_data'
+
+        Returns:
+            int32 squared magnitude computed from the raw (imag, real)
+            values if use_magnitude_squared is set, otherwise the frame's
+            amplitude
+        """
+        if not self.use_magnitude_squared:
+            return frame['amplitude']
+
+        raw = frame['raw_data']
+        pairs = raw[:len(raw) // 2 * 2].reshape(-1, 2).astype(np.int32)
+        power = pairs[:, 0] * pairs[:, 0] + pairs[:, 1] * pairs[:, 1]
+
+        # Skip first 2 values (invalid per ESP32 spec), as the parser does
+        return power[2:] if len(power) > 2 else power
 
     def hampel_filter(
         self,
@@ -51,61 +197,198 @@ class CSIPreprocessor:
         Remove outliers using Hampel filter.
 
         Args:
-            data: 1D array of values
+            data: 1D array of values, or 2D array filtered per column
             window_size: Half-window size for median calculation
             n_sigma: Number of MAD (median absolute deviation) for threshold
 
         Returns:
             Filtered data with outliers replaced by median
         """
-        filtered = np.copy(data)
-        n = len(data)
-
-        for i in range(window_size, n - window_size):
-            window = data[i - window_size:i + window_size + 1]
-            median = np.median(window)
-            mad = np.median(np.abs(window - median))
-            threshold = n_sigma * 1.4826 * mad
-
-            if np.abs(data[i] - median) > threshold:
-                filtered[i] = median
-
-        return filtered
+        data = np.asarray(data)
+        if data.ndim == 1:
+            return _hampel_filter(data.reshape(-1, 1), window_size, n_sigma).ravel()
+        return _hampel_filter(data, window_size, n_sigma)
 
     def preprocess(self, amplitude_data: np.ndarray) -> np.ndarray:
         """
         Apply preprocessing pipeline to CSI amplitude data.
 
+        Every stage runs in float32, which is plenty for CSI amplitudes
+        and halves the memory traffic of these memory-bound passes.
+
         Args:
             amplitude_data: Array of shape (n_frames, n_subcarriers)
 
         Returns:
-            Preprocessed data of same shape
+            Preprocessed float32 data of same shape
         """
         if amplitude_data.ndim == 1:
             amplitude_data = amplitude_data.reshape(-1, 1)
 
-        processed = np.zeros_like(amplitude_data, dtype=np.float64)
+        # Every stage runs along the time axis for all subcarriers at once
+        processed = amplitude_data.astype(np.float32, copy=False)
+
+        # 1. Remove outliers
+        processed = self.hampel_filter(processed)
+
+        # 2. Apply lowpass filter (if enough samples)
+        if len(processed) > self.filter_order * 3:
+            try:
+                processed = signal.sosfiltfilt(self._sos32, processed, axis=0)
+            except ValueError:
+                pass  # Skip filtering if signal too short
+
+        # 3. Smooth with running mean
+        processed = uniform_filter1d(processed, size=5, axis=0)
 
-        for i in range(amplitude_data.shape[1]):  # For each subcarrier
-            subcarrier = amplitude_data[:, i].astype(np.float64)
+        return processed.astype(np.float32, copy=False)
 
-            # 1. Remove outliers
-            subcarrier = self.hampel_filter(subcarrier)
 
-            # 2. Apply lowpass filter (if enough samples)
-            if len(subcarrier) > self.filter_order * 3:
-                try:
-                    subcarrier = signal.filtfilt(self.b, self.a, subcarrier)
-                except ValueError:
-                    pass  # Skip filtering if signal too short
+def _window_features(window: np.ndarray) -> np.ndarray:
+    """
+    Compute the FeatureExtractor features for one window in a single pass.
 
-            # 3. Smooth with running mean
-            subcarrier = uniform_filter1d(subcarrier, size=5)
+    Compiled with numba when available. The spectrum is evaluated as a
+    direct DFT over the bins the features use, which for window sizes
+    of ~100 frames is cheaper than calling out to an FFT.
 
-            processed[:, i] = subcarrier
+    Args:
+        window: float32 array of shape (window_size, n_subcarriers)
 
-        return processed
+    Returns:
+        1D float32 feature vector (same layout as FeatureExtractor.get_feature_names)
+    """
+    n_frames, n_subcarriers = window.shape
+    out = np.zeros(14, dtype=np.float32)
+
+    # Mean amplitude per frame
+    mean_amp = np.empty(n_frames)
+    for t in range(n_frames):
+        acc = 0.0
+        for j in range(n_subcarriers):
+            acc += window[t, j]
+        mean_amp[t] = acc / n_subcarriers
+
+    # 1. Overall statistics
+    mu = 0.0
+    lo = mean_amp[0]
+    hi = mean_amp[0]
+    for t in range(n_frames):
+        mu += mean_amp[t]
+        lo = min(lo, mean_amp[t])
+        hi = max(hi, mean_amp[t])
+    mu /= n_frames
+    var = 0.0
+    for t in range(n_frames):
+        d = mean_amp[t] - mu
+        var += d * d
+    var /= n_frames
+    out[0] = mu
+    out[1] = np.sqrt(var)
+    out[2] = var
+    out[3] = hi - lo
+
+    # 2. Per-subcarrier variance (motion indicator)
+    sub_var = np.empty(n_subcarriers)
+    for j in range(n_subcarriers):
+        m = 0.0
+        for t in range(n_frames):
+            m += window[t, j]
+        m /= n_frames
+        v = 0.0
+        for t in range(n_frames):
+            d = window[t, j] - m
+            v += d * d
+        sub_var[j] = v / n_frames
+    sv_mean = sub_var.mean()
+    sv_var = 0.0
+    for j in range(n_subcarriers):
+        d = sub_var[j] - sv_mean
+        sv_var += d * d
+    out[4] = sv_mean
+    out[5] = np.sqrt(sv_var / n_subcarriers)
+    out[6] = sub_var.max()
+
+    # 3. Temporal gradient features
+    n_grad = n_frames - 1
+    if n_grad > 0:
+        g_sum = 0.0
+        g_abs = 0.0
+        g_max = 0.0
+        for t in range(n_grad):
+            g = mean_amp[t + 1] - mean_amp[t]
+            g_sum += g
+            g_abs += abs(g)
+            g_max = max(g_max, abs(g))
+        g_mean = g_sum / n_grad
+        g_var = 0.0
+        for t in range(n_grad):
+            d = mean_amp[t + 1] - mean_amp[t] - g_mean
+            g_var += d * d
+        out[7] = g_abs / n_grad
+        out[8] = np.sqrt(g_var / n_grad)
+        out[9] = g_max
+
+    # 4. Frequency domain features (DFT magnitude of detrended mean amplitude)
+    if n_frames >= 32:
+        n_bins = n_frames // 2
+        cos_table = np.empty(n_frames)
+        sin_table = np.empty(n_frames)
+        for t in range(n_frames):
+            angle = 2.0 * np.pi * t / n_frames
+            cos_table[t] = np.cos(angle)
+            sin_table[t] = np.sin(angle)
+        mags = np.zeros(n_bins)
+        for k in range(1, n_bins):
+            re = 0.0
+            im = 0.0
+            for t in range(n_frames):
+                idx = (k * t) % n_frames
+                x = mean_amp[t] - mu
+                re += x * cos_table[idx]
+                im -= x * sin_table[idx]
+            mags[k] = np.sqrt(re * re + im * im)
+        if n_bins > 10:
+            out[10] = mags[1:10].mean()
+        if n_bins > 20:
+            out[11] = mags[10:20].mean()
+        if n_bins > 1:
+            out[12] = mags[1:].max()
+
+    # 5. Cross-subcarrier correlation
+    if n_subcarriers >= 2:
+        a_mean = 0.0
+        b_mean = 0.0
+        for t in range(n_frames):
+            a_mean += window[t, 0]
+            b_mean += window[t, n_subcarriers - 1]
+        a_mean /= n_frames
+        b_mean /= n_frames
+        ab = 0.0
+        aa = 0.0
+        bb = 0.0
+        for t in range(n_frames):
+            da = window[t, 0] - a_mean
+            db = window[t, n_subcarriers - 1] - b_mean
+            ab += da * db
+            aa += da * da
+            bb += db * db
+        if aa > 0.0 and bb > 0.0:
+            out[13] = ab / np.sqrt(aa * bb)
+
+    return out
+
+
+if njit is not None:
+    _window_features = njit(fastmath=True, nogil=True)(_window_features)
+
+    @njit(parallel=True, nogil=True, fastmath=True)
+    def _batch_window_features(windows: np.ndarray) -> np.ndarray:
+        """Features for every window, spread across all CPU cores."""
+        out = np.empty((windows.shape[0], 14), dtype=np.float32)
+        for i in prange(windows.shape[0]):
+            out[i] = _window_features(windows[i])
+        return out
 
 
 class FeatureExtractor:
@@ -130,13 +413,17 @@ class FeatureExtractor:
         Returns:
             1D feature vector
         """
+        if njit is not None:
+            return _window_features(np.ascontiguousarray(amplitude_window, dtype=np.float32))
+
         features = []
 
         # Mean amplitude per frame
         mean_amp = np.mean(amplitude_window, axis=1)
 
         # 1. Overall statistics
-        features.append(np.mean(mean_amp))
+        mu = np.mean(mean_amp)
+        features.append(mu)
         features.append(np.std(mean_amp))
         features.append(np.var(mean_amp))
         features.append(np.max(mean_amp) - np.min(mean_amp))  # Range
@@ -159,8 +446,8 @@ class FeatureExtractor:
 
         # 4. Frequency domain features
         if len(mean_amp) >= 32:
-            # Remove DC component and compute FFT
-            fft = np.abs(np.fft.fft(mean_amp - np.mean(mean_amp)))[:len(mean_amp) // 2]
+            # Remove DC component and compute FFT (real input: half spectrum only)
+            fft = np.abs(np.fft.rfft(mean_amp - mu))[:len(mean_amp) // 2]
             features.extend([
                 np.mean(fft[1:10]) if len(fft) > 10 else 0,  # Low frequency energy
                 np.mean(fft[10:20]) if len(fft) > 20 else 0,  # Mid frequency energy
@@ -171,12 +458,86 @@ class FeatureExtractor:
 
         # 5. Cross-subcarrier correlation
         if amplitude_window.shape[1] >= 2:
-            corr = np.corrcoef(amplitude_window[:, 0], amplitude_window[:, -1])[0, 1]
-            features.append(corr if not np.isnan(corr) else 0)
+            # Pearson coefficient directly, without np.corrcoef's 2x2 matrix
+            first = amplitude_window[:, 0] - np.mean(amplitude_window[:, 0])
+            last = amplitude_window[:, -1] - np.mean(amplitude_window[:, -1])
+            denom = np.sqrt(np.dot(first, first) * np.dot(last, last))
+            features.append(np.dot(first, last) / denom if denom > 0 else 0)
         else:
             features.append(0)
 
-        return np.array(features)
+        return np.array(features, dtype=np.float32)
+
+    def extract_features_batch(self, windows: np.ndarray) -> np.ndarray:
+        """
+        Extract features from many windows at once.
+
+        Computes the same features as extract_features. With numba the
+        windows are processed in parallel across CPU cores; otherwise
+        axis-wise NumPy reductions run over the whole batch instead of
+        a Python call per window.
+
+        Args:
+            windows: Array of shape (n_windows, window_size, n_subcarriers)
+
+        Returns:
+            Feature matrix of shape (n_windows, n_features)
+        """
+        if njit is not None:
+            return _batch_window_features(np.asarray(windows, dtype=np.float32))
+
+        windows = np.asarray(windows, dtype=np.float32)
+        n_windows, n_frames, n_subcarriers = windows.shape
+        features = np.zeros((n_windows, len(self.get_feature_names())), dtype=np.float32)
+        if n_windows == 0:
+            return features
+
+        # Mean amplitude per frame
+        mean_amp = windows.mean(axis=2)
+
+        # 1. Overall statistics (std taken from the variance, not a second pass)
+        mu = mean_amp.mean(axis=1)
+        mean_var = mean_amp.var(axis=1)
+        features[:, 0] = mu
+        features[:, 1] = np.sqrt(mean_var)
+        features[:, 2] = mean_var
+        features[:, 3] = np.ptp(mean_amp, axis=1)
+
+        # 2. Per-subcarrier variance (motion indicator)
+        subcarrier_var = windows.var(axis=1)
+        features[:, 4] = subcarrier_var.mean(axis=1)
+        features[:, 5] = subcarrier_var.std(axis=1)
+        features[:, 6] = subcarrier_var.max(axis=1)
+
+        # 3. Temporal gradient features
+        gradient = np.diff(mean_amp, axis=1)
+        abs_gradient = np.abs(gradient)
+        features[:, 7] = abs_gradient.mean(axis=1)
+        features[:, 8] = gradient.std(axis=1)
+        features[:, 9] = abs_gradient.max(axis=1)
+
+        # 4. Frequency domain features
+        if n_frames >= 32:
+            fft = np.abs(np.fft.rfft(mean_amp - mu[:, np.newaxis], axis=1))[:, :n_frames // 2]
+            n_bins = fft.shape[1]
+            if n_bins > 10:
+                features[:, 10] = fft[:, 1:10].mean(axis=1)
+            if n_bins > 20:
+                features[:, 11] = fft[:, 10:20].mean(axis=1)
+            if n_bins > 1:
+                features[:, 12] = fft[:, 1:].max(axis=1)
+
+        # 5. Cross-subcarrier correlation
+        if n_subcarriers >= 2:
+            first = windows[:, :, 0] - windows[:, :, 0].mean(axis=1, keepdims=True)
+            last = windows[:, :, -1] - windows[:, :, -1].mean(axis=1, keepdims=True)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                corr = (first * last).sum(axis=1) / np.sqrt(
+                    (first * first).sum(axis=1) * (last * last).sum(axis=1)
+                )
+            features[:, 13] = np.nan_to_num(corr, nan=0.0)
+
+        return features
 
     def get_feature_names(self) -> List[str]:
         """Get names of extracted features."""
@@ -221,7 +582,13 @@ class PresenceDetector:
         """
         self.variance_threshold = variance_threshold
         self.window_size = window_size
-        self.buffer: deque = deque(maxlen=window_size)
+
+        # Ring of recent mean amplitudes with running sums: O(1) variance per frame
+        self.buffer = np.zeros(window_size, dtype=np.float32)
+        self._head = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
         self.baseline_variance: Optional[float] = None
         self.is_calibrated = False
 
@@ -242,7 +609,24 @@ class PresenceDetector:
         """
         data = empty_room_data[:duration_frames]
         mean_amplitude = np.mean(data, axis=1)
-        self.baseline_variance = np.var(mean_amplitude)
+        self.calibrate_from_variance(float(np.var(mean_amplitude)), threshold_multiplier)
+
+    def calibrate_from_variance(
+        self,
+        baseline_variance: float,
+        threshold_multiplier: float = 3.0
+    ):
+        """
+        Calibrate detector from an empty room variance computed elsewhere.
+
+        Lets callers stream the baseline statistics while collecting
+        instead of keeping the calibration frames around.
+
+        Args:
+            baseline_variance: Variance of the per-frame mean amplitude
+            threshold_multiplier: Multiply baseline variance by this for threshold
+        """
+        self.baseline_variance = baseline_variance
         self.variance_threshold = self.baseline_variance * threshold_multiplier
         self.is_calibrated = True
 
@@ -259,13 +643,76 @@ class PresenceDetector:
         Returns:
             Tuple of (is_present, confidence, variance)
         """
-        mean_amp = np.mean(amplitude_frame)
-        self.buffer.append(mean_amp)
+        if self._count == self.window_size:
+            old = float(self.buffer[self._head])
+            self._sum -= old
+            self._sum_sq -= old * old
+        else:
+            self._count += 1
+        self.buffer[self._head] = np.mean(amplitude_frame)
+        mean_amp = float(self.buffer[self._head])  # Accumulate the value actually stored
+        self._sum += mean_amp
+        self._sum_sq += mean_amp * mean_amp
+        self._head = (self._head + 1) % self.window_size
+
+        # Re-sum once per wrap so rounding errors don't accumulate
+        if self._head == 0:
+            self._resum()
+
+        return self._result()
+
+    def detect_batch(self, amplitude_block: np.ndarray) -> Tuple[bool, float, float]:
+        """
+        Detect presence after a block of consecutive frames.
+
+        Same state update as calling detect on each row, but the frame means
+        are taken in one reduction and written to the window in one step.
+
+        Args:
+            amplitude_block: 2D array of amplitudes, shape (n_frames, n_subcarriers)
+
+        Returns:
+            Tuple of (is_present, confidence, variance) after the last frame
+        """
+        n = len(amplitude_block)
+        if n == 0:
+            return self._result()
+
+        # Only the last window_size frames can still be in the window
+        skip = max(n - self.window_size, 0)
+        means = np.mean(amplitude_block[skip:], axis=1, dtype=np.float32)
+        idx = (self._head + np.arange(skip, n)) % self.window_size
+        wraps = self._head + n >= self.window_size
+        if not wraps and self._count == self.window_size:
+            old = self.buffer[idx].astype(np.float64)
+            self._sum -= float(old.sum())
+            self._sum_sq -= float(np.dot(old, old))
+        self.buffer[idx] = means
+        self._count = min(self._count + n, self.window_size)
+        self._head = (self._head + n) % self.window_size
+
+        if wraps:
+            self._resum()
+        else:
+            new = means.astype(np.float64)
+            self._sum += float(new.sum())
+            self._sum_sq += float(np.dot(new, new))
+
+        return self._result()
 
-        if len(self.buffer) < self.window_size // 2:
+    def _resum(self):
+        """Recompute the running sums from the window."""
+        window = self.buffer[:self._count].astype(np.float64)
+        self._sum = float(window.sum())
+        self._sum_sq = float(np.dot(window, window))
+
+    def _result(self) -> Tuple[bool, float, float]:
+        """Detection result for the current window."""
+        if self._count < self.window_size // 2:
             return False, 0.0, 0.0
 
-        current_variance = np.var(list(self.buffer))
+        mean = self._sum / self._count
+        current_variance = max(self._sum_sq / self._count - mean * mean, 0.0)
 
         # Presence detection based on variance exceeding threshold
         is_present = current_variance > self.variance_threshold
@@ -280,12 +727,15 @@ class PresenceDetector:
 
     def reset(self):
         """Reset detection buffer."""
-        self.buffer.clear()
+        self._head = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
 
 
 class ActivityClassifier:
     """
-    ML-based activity classification using Random Forest.
+    ML-based activity classification using gradient boosted trees.
 
     Classes:
     - no_presence: No human in detection zone
@@ -296,44 +746,96 @@ class ActivityClassifier:
 
     CLASSES = ['no_presence', 'static_presence', 'small_movement', 'large_movement']
 
-    def __init__(self, n_estimators: int = 100, random_state: int = 42):
+    def __init__(
+        self,
+        n_estimators: int = 100,
+        random_state: int = 42,
+        n_jobs: int = -1,
+        model_type: str = 'hist_gradient_boosting'
+    ):
         """
         Initialize activity classifier.
 
+        The default HistGradientBoostingClassifier bins each feature into
+        at most 255 levels and predicts by walking shallow trees over
+        those bins, which is much faster than a 100-tree Random Forest.
+        Trees don't depend on feature scale, so no scaler is fitted.
+
+        For the Random Forest, training and batch prediction use n_jobs
+        workers; single-window predict() always runs on one thread, since
+        dispatching 100 tiny tree walks to a pool costs more than running them.
+        After fit and load the model's own n_jobs is left unset (one thread),
+        and batch prediction supplies the workers through a joblib context.
+
         Args:
-            n_estimators: Number of trees in Random Forest
+            n_estimators: Number of boosting iterations / trees in Random Forest
             random_state: Random seed for reproducibility
+            n_jobs: Parallel jobs for the Random Forest (-1 = all cores);
+                    gradient boosting always uses all OpenMP threads
+            model_type: 'hist_gradient_boosting' or 'random_forest'
         """
-        self.model = RandomForestClassifier(
-            n_estimators=n_estimators,
-            random_state=random_state
-        )
-        self.scaler = StandardScaler()
+        self.n_jobs = n_jobs
+        if model_type == 'hist_gradient_boosting':
+            self.model = HistGradientBoostingClassifier(
+                max_iter=n_estimators,
+                max_bins=255,
+                random_state=random_state
+            )
+        elif model_type == 'random_forest':
+            self.model = RandomForestClassifier(
+                n_estimators=n_estimators,
+                random_state=random_state,
+                n_jobs=n_jobs
+            )
+        else:
+            raise ValueError(f"Unknown model_type: {model_type}")
+
+        # Only set for models saved with a fitted scaler
+        self.scaler: Optional[StandardScaler] = None
         self.feature_extractor = FeatureExtractor()
         self.is_trained = False
 
-    def train(self, X_windows: List[np.ndarray], y_labels: List[str]):
+    def _scale(self, features: np.ndarray) -> np.ndarray:
+        """Apply the scaler of an older saved model, if any."""
+        if self.scaler is None:
+            return features
+        return self.scaler.transform(features)
+
+    def _set_n_jobs(self, n_jobs: Optional[int]):
+        """Set worker count on models that have one."""
+        if 'n_jobs' in self.model.get_params():
+            self.model.set_params(n_jobs=n_jobs)
+
+    def train(self, X_windows: np.ndarray, y_labels: List[str]):
         """
         Train the activity classifier.
 
         Args:
-            X_windows: List of amplitude windows (each: window_size x n_subcarriers)
+            X_windows: Amplitude windows (n_windows x window_size x n_subcarriers)
             y_labels: List of activity labels (strings from CLASSES)
         """
         # Extract features from all windows
-        features = np.array([
-            self.feature_extractor.extract_features(w) for w in X_windows
-        ])
+        features = self.feature_extractor.extract_features_batch(X_windows)
+        self.train_precomputed(features, y_labels)
 
-        # Scale features
-        features_scaled = self.scaler.fit_transform(features)
+    def train_precomputed(self, features: np.ndarray, y_labels: List[str]):
+        """
+        Train the activity classifier on already extracted features.
 
+        Args:
+            features: Feature matrix (n_windows x n_features) from FeatureExtractor
+            y_labels: List of activity labels (strings from CLASSES)
+        """
         # Train model
-        self.model.fit(features_scaled, y_labels)
+        self.scaler = None
+        self._set_n_jobs(self.n_jobs)
+        self.model.fit(features, y_labels)
+        self._set_n_jobs(None)
         self.is_trained = True
 
-        print(f"Trained on {len(X_windows)} samples")
-        print(f"Feature importance: {self.model.feature_importances_}")
+        print(f"Trained on {len(features)} samples")
+        if hasattr(self.model, 'feature_importances_'):
+            print(f"Feature importance: {self.model.feature_importances_}")
 
     def predict(self, amplitude_window: np.ndarray) -> Tuple[str, Dict[str, float]]:
         """
@@ -349,16 +851,47 @@ class ActivityClassifier:
             raise ValueError("Model not trained. Call train() first.")
 
         features = self.feature_extractor.extract_features(amplitude_window)
-        features_scaled = self.scaler.transform(features.reshape(1, -1))
+        features_scaled = self._scale(features.reshape(1, -1))
 
-        prediction = self.model.predict(features_scaled)[0]
-        probabilities = dict(zip(
-            self.CLASSES,
-            self.model.predict_proba(features_scaled)[0]
-        ))
+        # Probabilities are in model.classes_ order (sorted labels)
+        proba = self.model.predict_proba(features_scaled)[0]
+        prediction = self.model.classes_[np.argmax(proba)]
+        probabilities = dict(zip(self.model.classes_.tolist(), proba))
 
         return prediction, probabilities
 
+    def predict_batch(self, windows: np.ndarray) -> np.ndarray:
+        """
+        Predict activity classes for many CSI windows in one call.
+
+        Args:
+            windows: Array of shape (n_windows, window_size, n_subcarriers)
+
+        Returns:
+            Array of predicted class labels
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Call train() first.")
+
+        features = self.feature_extractor.extract_features_batch(windows)
+        return self.predict_precomputed(features)
+
+    def predict_precomputed(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict activity classes from already extracted features.
+
+        Args:
+            features: Feature matrix (n_windows x n_features) from FeatureExtractor
+
+        Returns:
+            Array of predicted class labels
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Call train() first.")
+
+        with parallel_backend('threading', n_jobs=self.n_jobs):
+            return self.model.predict(self._scale(features))
+
     def save(self, filepath: str):
         """Save trained model to file."""
         with open(filepath, 'wb') as f:
@@ -376,6 +909,7 @@ class ActivityClassifier:
             self.model = data['model']
             self.scaler = data['scaler']
             self.is_trained = data['is_trained']
+        self._set_n_jobs(None)
         print(f"Model loaded from {filepath}")
 
 
@@ -383,19 +917,26 @@ def create_windows(
     amplitudes: np.ndarray,
     window_size: int = 100,
     stride: int = 50
-) -> List[np.ndarray]:
+) -> np.ndarray:
     """
     Create overlapping windows from amplitude data.
 
+    Windows are a zero-copy strided view, so no data is duplicated
+    however much they overlap.
+
     Args:
         amplitudes: Array of shape (n_frames, n_subcarriers)
         window_size: Number of frames per window
         stride: Step size between windows
 
     Returns:
-        List of windows
+        Read-only array of shape (n_windows, window_size, n_subcarriers)
     """
-    windows = []
-    for i in range(0, len(amplitudes) - window_size, stride):
-        windows.append(amplitudes[i:i + window_size])
-    return windows
+    n_frames, n_subcarriers = amplitudes.shape
+    if n_frames <= window_size:
+        return np.empty((0, window_size, n_subcarriers), dtype=amplitudes.dtype)
+
+    windows = np.lib.stride_tricks.sliding_window_view(
+        amplitudes, (window_size, n_subcarriers)
+    )[:, 0]
+    return windows[:n_frames - window_size:stride]
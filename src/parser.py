@@ -4,11 +4,42 @@ CSI Data Parser
 Parses raw CSI data from ESP32 serial output into structured format.
 """
 
+import os
 import numpy as np
-import csv
+import pandas as pd
+import struct
+import zlib
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to plain NumPy
+    njit = None
+
+# Characters wrapping the CSI array in esp-csi output ("[...]"), stripped
+# before tokenizing so the first and last values aren't lost (a per-value
+# isdigit check dropped "[4" and "6]", shifting every (imag, real) pair)
+_CSI_STRIP = str.maketrans('', '', '[]"')
+
+# Metadata field names for the first 24 comma-separated columns
+_META_KEYS = (
+    'type', 'id', 'mac', 'rssi', 'rate', 'sig_mode', 'mcs', 'bandwidth',
+    'smoothing', 'not_sounding', 'aggregation', 'stbc', 'fec_coding', 'sgi',
+    'noise_floor', 'ampdu_cnt', 'channel', 'secondary_channel',
+    'local_timestamp', 'ant', 'sig_len', 'rx_state', 'len', 'first_word',
+)
+
+# Which of the _META_KEYS fields hold integers
+_META_INT_MASK = tuple(key not in ('type', 'mac') for key in _META_KEYS)
+
+# Binary CSI frame (see firmware/README.md):
+#   magic 0xAA 0x55 | header <HIbx (n_values, seq, rssi) | n_values x int16 | CRC32
+BINARY_MAGIC = b'\xaa\x55'
+_BINARY_HEADER = struct.Struct('<HIbx')
+_BINARY_CRC = struct.Struct('<I')
+_BINARY_MAX_VALUES = 1024  # Larger counts can only come from a false sync
+
 
 @dataclass
 class CSIFrame:
@@ -31,10 +62,105 @@ class CSIFrame:
     amplitude: np.ndarray
     phase: np.ndarray
     csi_complex: np.ndarray
-    raw_data: List[int]
+    raw_data: np.ndarray
 
 
-def parse_csi_line(line: str) -> Optional[Dict[str, Any]]:
+def _csi_amplitude(raw: np.ndarray) -> np.ndarray:
+    """
+    Compute subcarrier amplitudes from raw interleaved CSI values.
+
+    Args:
+        raw: int16 array of (imaginary, real) pairs
+
+    Returns:
+        float32 amplitude per subcarrier, first 2 (invalid) subcarriers skipped
+    """
+    pairs = raw[:len(raw) // 2 * 2].reshape(-1, 2)
+    amp = np.hypot(pairs[:, 1], pairs[:, 0], dtype=np.float32)
+    return amp[2:] if len(amp) > 2 else amp
+
+
+if njit is not None:
+    # No cache=True: this module is imported both as src.parser and, from
+    # scripts that put src/ on sys.path, as parser. numba's on-disk cache is
+    # keyed by file, and an entry written under one module name fails to
+    # load under the other, so kernels compile at import instead.
+    @njit(fastmath=True)
+    def _csi_amplitude(raw: np.ndarray) -> np.ndarray:
+        n = len(raw) // 2
+        start = 2 if n > 2 else 0
+        amp = np.empty(n - start, dtype=np.float32)
+        for i in range(start, n):
+            imag = np.float32(raw[2 * i])
+            real = np.float32(raw[2 * i + 1])
+            amp[i - start] = np.sqrt(real * real + imag * imag)
+        return amp
+
+    _csi_amplitude(np.zeros(128, dtype=np.int16))  # Compile at import, not on the first frame
+
+
+def _parse_csi_values(text: str) -> np.ndarray:
+    """
+    Parse the CSI value list of a CSI_DATA line.
+
+    Args:
+        text: Comma-separated values, optionally wrapped as "[...]"
+
+    Returns:
+        int16 array of raw CSI values
+    """
+    return np.fromstring(text.translate(_CSI_STRIP), sep=',', dtype=np.int16)
+
+
+if njit is not None:
+    @njit(nogil=True)
+    def _scan_csi_fields(buf: np.ndarray, out: np.ndarray, ends: np.ndarray) -> int:
+        """
+        Single pass integer scan over ASCII bytes, without holding the GIL.
+
+        buf holds one or more CSI value lists separated by newlines; the
+        values of field i end up in out[ends[i - 1]:ends[i]]. Newlines
+        beyond the len(ends) - 1 field breaks are plain separators, so a
+        stray '\n' can't write past ends. Returns the total value count.
+        """
+        n = 0
+        field = 0
+        value = 0
+        negative = False
+        in_number = False
+        for i in range(len(buf)):
+            c = buf[i]
+            if 48 <= c <= 57:  # '0'-'9'
+                value = value * 10 + (c - 48)
+                in_number = True
+            elif c == 45:  # '-'
+                negative = True
+            elif c == 44 or c == 93 or c == 10:  # ',' or ']' or '\n'
+                if in_number:
+                    out[n] = -value if negative else value
+                    n += 1
+                value = 0
+                negative = False
+                in_number = False
+                if c == 10 and field + 1 < len(ends):
+                    ends[field] = n
+                    field += 1
+        if in_number:
+            out[n] = -value if negative else value
+            n += 1
+        ends[field] = n
+        return n
+
+    def _parse_csi_values(text: str) -> np.ndarray:
+        buf = np.frombuffer(text.encode('ascii', 'ignore'), dtype=np.uint8)
+        # Every value takes at least one digit and one separator
+        out = np.empty(len(buf) // 2 + 1, dtype=np.int16)
+        return out[:_scan_csi_fields(buf, out, np.empty(1, dtype=np.int64))]
+
+    _parse_csi_values('[0,-1]')  # Compile at import, not on the first frame
+
+
+def parse_csi_line(line: str, recycled: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
     """
     Parse a single CSI_DATA line from ESP32.
 
@@ -46,75 +172,288 @@ def parse_csi_line(line: str) -> Optional[Dict[str, Any]]:
 
     Args:
         line: Raw CSI_DATA line from serial output
+        recycled: Optional frame that is no longer used; its csi_complex,
+                  amplitude and phase arrays are overwritten and reused
+                  if they have the right size
 
     Returns:
         Dictionary with parsed metadata and CSI values, or None if parsing fails
     """
-    parts = line.split(',')
+    parts = _split_csi_line(line)
+    if parts is None:
+        return None
+
+    try:
+        metadata = _csi_metadata(parts)
 
-    if len(parts) < 26:
+        # Extract raw CSI data (starts at index 24) in a single compiled pass
+        # Format: imaginary, real pairs for each subcarrier
+        raw_data = _parse_csi_values(parts[24])
+
+        # Complex CSI, amplitude and phase as whole-array operations
+        metadata.update(_frame_from_raw(raw_data, recycled))
+
+        return metadata
+
+    except (ValueError, IndexError) as e:
+        return None
+
+
+def parse_csi_lines(lines: List[str], recycled: Optional[List[Dict[str, Any]]] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Parse a batch of CSI_DATA lines.
+
+    Same result as calling parse_csi_line on each line, but with numba
+    the CSI values of all lines are scanned in one compiled call that
+    releases the GIL, so a collector thread parsing a serial read
+    competes less with detection running in other threads.
+
+    Args:
+        lines: Raw CSI_DATA lines from serial output
+        recycled: Optional pool (list or deque) of frames that are no longer
+                  used; frames are popped from it and their arrays reused
+
+    Returns:
+        Parsed frame (or None if parsing fails) for each line
+    """
+    if njit is None:
+        return [
+            parse_csi_line(line, recycled.pop() if recycled else None)
+            for line in lines
+        ]
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(lines)
+    valid = []
+    for i, line in enumerate(lines):
+        parts = _split_csi_line(line)
+        if parts is None:
+            continue
+        try:
+            results[i] = _csi_metadata(parts)
+        except (ValueError, IndexError):
+            continue
+        # Newlines separate the lines in the joined buffer below
+        valid.append((i, parts[24].rstrip('\r\n')))
+
+    if not valid:
+        return results
+
+    buf = np.frombuffer(
+        '\n'.join([text for _, text in valid]).encode('ascii', 'ignore'), dtype=np.uint8
+    )
+    out = np.empty(len(buf) // 2 + len(valid), dtype=np.int16)
+    ends = np.empty(len(valid), dtype=np.int64)
+    _scan_csi_fields(buf, out, ends)
+
+    start = 0
+    for (i, _), end in zip(valid, ends.tolist()):
+        frame = results[i]
+        frame.update(_frame_from_raw(out[start:end], recycled.pop() if recycled else None))
+        start = end
+    return results
+
+
+def _split_csi_line(line: str) -> Optional[List[str]]:
+    """Split a CSI_DATA line into 24 metadata fields and the CSI value list."""
+    parts = line.split(',', 24)
+
+    if len(parts) < 25:
         return None
 
     if not parts[0].startswith('CSI_DATA'):
         return None
 
+    return parts
+
+
+def _csi_metadata(parts: List[str]) -> Dict[str, Any]:
+    """
+    Extract the metadata fields of a split CSI_DATA line.
+
+    Well-formed esp-csi output has an integer in every numeric field, so
+    those are converted straight away; the per-field checks only run for
+    lines where that fails.
+    """
     try:
-        # Extract metadata
-        metadata = {
+        return {
             'type': parts[0],
-            'id': int(parts[1]) if parts[1].strip().lstrip('-').isdigit() else 0,
+            'id': int(parts[1]),
             'mac': parts[2],
-            'rssi': int(parts[3]) if parts[3].strip().lstrip('-').isdigit() else 0,
-            'rate': int(parts[4]) if parts[4].strip().isdigit() else 0,
-            'sig_mode': int(parts[5]) if parts[5].strip().isdigit() else 0,
-            'mcs': int(parts[6]) if parts[6].strip().isdigit() else 0,
-            'bandwidth': int(parts[7]) if parts[7].strip().isdigit() else 0,
-            'smoothing': int(parts[8]) if parts[8].strip().isdigit() else 0,
-            'not_sounding': int(parts[9]) if parts[9].strip().isdigit() else 0,
-            'aggregation': int(parts[10]) if parts[10].strip().isdigit() else 0,
-            'stbc': int(parts[11]) if parts[11].strip().isdigit() else 0,
-            'fec_coding': int(parts[12]) if parts[12].strip().isdigit() else 0,
-            'sgi': int(parts[13]) if parts[13].strip().isdigit() else 0,
-            'noise_floor': int(parts[14]) if parts[14].strip().lstrip('-').isdigit() else 0,
-            'ampdu_cnt': int(parts[15]) if parts[15].strip().isdigit() else 0,
-            'channel': int(parts[16]) if parts[16].strip().isdigit() else 0,
-            'secondary_channel': int(parts[17]) if parts[17].strip().isdigit() else 0,
-            'local_timestamp': int(parts[18]) if parts[18].strip().isdigit() else 0,
-            'ant': int(parts[19]) if parts[19].strip().isdigit() else 0,
-            'sig_len': int(parts[20]) if parts[20].strip().isdigit() else 0,
-            'rx_state': int(parts[21]) if parts[21].strip().isdigit() else 0,
-            'len': int(parts[22]) if parts[22].strip().isdigit() else 0,
-            'first_word': int(parts[23]) if parts[23].strip().isdigit() else 0,
+            'rssi': int(parts[3]),
+            'rate': int(parts[4]),
+            'sig_mode': int(parts[5]),
+            'mcs': int(parts[6]),
+            'bandwidth': int(parts[7]),
+            'smoothing': int(parts[8]),
+            'not_sounding': int(parts[9]),
+            'aggregation': int(parts[10]),
+            'stbc': int(parts[11]),
+            'fec_coding': int(parts[12]),
+            'sgi': int(parts[13]),
+            'noise_floor': int(parts[14]),
+            'ampdu_cnt': int(parts[15]),
+            'channel': int(parts[16]),
+            'secondary_channel': int(parts[17]),
+            'local_timestamp': int(parts[18]),
+            'ant': int(parts[19]),
+            'sig_len': int(parts[20]),
+            'rx_state': int(parts[21]),
+            'len': int(parts[22]),
+            'first_word': int(parts[23]),
         }
+    except ValueError:
+        return _csi_metadata_checked(parts)
 
-        # Extract raw CSI data (starts at index 24)
-        # Format: imaginary, real pairs for each subcarrier
-        raw_data = []
-        for x in parts[24:]:
-            x_clean = x.strip()
-            if x_clean and (x_clean.lstrip('-').isdigit()):
-                raw_data.append(int(x_clean))
-
-        # Convert to complex numbers (pairs of imag, real)
-        csi_complex = []
-        for i in range(0, len(raw_data) - 1, 2):
-            imag = raw_data[i]
-            real = raw_data[i + 1]
-            csi_complex.append(complex(real, imag))
-
-        # Skip first 2 values (invalid per ESP32 spec - first 4 bytes)
-        if len(csi_complex) > 2:
-            csi_complex = csi_complex[2:]
-
-        metadata['csi_complex'] = np.array(csi_complex)
-        metadata['amplitude'] = np.abs(metadata['csi_complex'])
-        metadata['phase'] = np.angle(metadata['csi_complex'])
-        metadata['raw_data'] = raw_data
 
-        return metadata
+def _safe_int(text: str) -> int:
+    """int(text), or 0 if text is not an integer."""
+    try:
+        return int(text)
+    except ValueError:
+        return 0
 
-    except (ValueError, IndexError) as e:
-        return None
+
+def _csi_metadata_checked(parts: List[str]) -> Dict[str, Any]:
+    """Extract metadata, using 0 for fields that are not integers."""
+    return {
+        key: _safe_int(value) if is_int else value
+        for key, is_int, value in zip(_META_KEYS, _META_INT_MASK, parts)
+    }
+
+
+def _csi_complex(raw: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert raw CSI values to complex numbers.
+
+    The (imag, real) pairs are swapped and converted to float32 in one
+    copy, which is then reinterpreted as complex64 without another pass.
+
+    Args:
+        raw: int16 array of (imaginary, real) pairs along the last axis
+        out: Optional contiguous complex64 array to write the result to
+
+    Returns:
+        complex64 array, first 2 (invalid) subcarriers skipped
+    """
+    n = raw.shape[-1] // 2
+    # Skip first 2 values (invalid per ESP32 spec - first 4 bytes)
+    start = 2 if n > 2 else 0
+    pairs = raw[..., :2 * n].reshape(raw.shape[:-1] + (n, 2))[..., start:, ::-1]
+    if out is None:
+        return np.ascontiguousarray(pairs, dtype=np.float32).view(np.complex64)[..., 0]
+    np.copyto(out.view(np.float32).reshape(pairs.shape), pairs, casting='unsafe')
+    return out
+
+
+def _frame_from_raw(raw: np.ndarray, recycled: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build the complex CSI, amplitude and phase arrays from raw values.
+
+    Args:
+        raw: int16 array of (imaginary, real) pairs
+        recycled: Optional unused frame whose arrays are overwritten
+                  instead of allocating new ones, if the sizes match
+
+    Returns:
+        Dictionary with csi_complex, amplitude, phase and raw_data
+    """
+    n = len(raw) // 2
+    n_subcarriers = n - 2 if n > 2 else n
+    if recycled is not None and len(recycled.get('amplitude', ())) == n_subcarriers:
+        csi_complex = _csi_complex(raw, out=recycled['csi_complex'])
+        return {
+            'csi_complex': csi_complex,
+            'amplitude': np.hypot(csi_complex.real, csi_complex.imag, out=recycled['amplitude']),
+            'phase': np.arctan2(csi_complex.imag, csi_complex.real, out=recycled['phase']),
+            'raw_data': raw,
+        }
+
+    csi_complex = _csi_complex(raw)
+
+    return {
+        'csi_complex': csi_complex,
+        'amplitude': _csi_amplitude(raw),
+        'phase': np.angle(csi_complex),
+        'raw_data': raw,
+    }
+
+
+def parse_binary_frames(buffer: bytearray) -> List[Dict[str, Any]]:
+    """
+    Extract all complete binary CSI frames from a receive buffer.
+
+    Consumed bytes (complete frames and any garbage before them) are
+    removed from the buffer in place; a trailing partial frame is kept
+    for the next call. Frames failing the CRC check are skipped.
+
+    Args:
+        buffer: Bytes received from the serial port
+
+    Returns:
+        List of parsed frames (type 'CSI_BIN', id is the sequence number)
+    """
+    frames = []
+    pos = 0
+    header_size = len(BINARY_MAGIC) + _BINARY_HEADER.size
+
+    while True:
+        start = buffer.find(BINARY_MAGIC, pos)
+        if start < 0:
+            # Keep a possible first magic byte at the very end
+            pos = max(pos, len(buffer) - 1)
+            break
+        if start + header_size > len(buffer):
+            pos = start
+            break
+
+        n_values, seq, rssi = _BINARY_HEADER.unpack_from(buffer, start + len(BINARY_MAGIC))
+        if n_values > _BINARY_MAX_VALUES:
+            pos = start + 1
+            continue
+        frame_end = start + header_size + 2 * n_values + _BINARY_CRC.size
+        if frame_end > len(buffer):
+            pos = start
+            break
+
+        body = bytes(buffer[start + len(BINARY_MAGIC):frame_end - _BINARY_CRC.size])
+        (crc,) = _BINARY_CRC.unpack_from(buffer, frame_end - _BINARY_CRC.size)
+        if zlib.crc32(body) != crc:
+            pos = start + 1  # Corrupted frame or false sync, search again
+            continue
+
+        raw = np.frombuffer(body, dtype='<i2', offset=_BINARY_HEADER.size).astype(np.int16)
+        frame = {'type': 'CSI_BIN', 'id': seq, 'mac': '', 'rssi': rssi}
+        frame.update(_frame_from_raw(raw))
+        frames.append(frame)
+        pos = frame_end
+
+    del buffer[:pos]
+    return frames
+
+
+def format_csi_line(frame: Dict[str, Any]) -> str:
+    """
+    Format a parsed frame as a CSI_DATA line.
+
+    Used to record binary frames in the same CSV format as ASCII output,
+    so recordings load with CSIParser regardless of the link protocol.
+    Metadata not carried by the frame is written as 0.
+
+    Args:
+        frame: Parsed CSI frame with 'raw_data'
+
+    Returns:
+        CSI_DATA line
+    """
+    meta = [
+        'CSI_DATA',
+        str(frame.get('id', 0)),
+        str(frame.get('mac', '')),
+        str(frame.get('rssi', 0)),
+    ]
+    meta += [str(frame.get(key, 0)) for key in _META_KEYS[4:]]
+    values = ','.join(map(str, np.asarray(frame['raw_data']).tolist()))
+    return ','.join(meta) + f',[{values}]'
 
 
 class CSIParser:
@@ -123,10 +462,21 @@ class CSIParser:
     def __init__(self):
         self.frames: List[Dict] = []
 
+        # Amplitude/phase matrices of bulk loaded files; the frames' arrays
+        # are rows of these
+        self._amplitudes: Optional[np.ndarray] = None
+        self._phases: Optional[np.ndarray] = None
+
     def load_file(self, filepath: str, has_timestamp_column: bool = True) -> List[Dict]:
         """
         Load and parse CSI data from a CSV file.
 
+        The whole file is tokenized with pandas' C parser and, when all
+        frames share the same subcarrier layout, the CSI values are
+        converted in a single vectorized pass. Files with mixed layouts
+        fall back to parsing line by line. Paths ending in .npz are
+        loaded with load_npz instead.
+
         Args:
             filepath: Path to CSV file
             has_timestamp_column: If True, expects first column to be timestamp
@@ -134,21 +484,92 @@ class CSIParser:
         Returns:
             List of parsed CSI frames
         """
-        self.frames = []
+        if filepath.endswith('.npz'):
+            return self.load_npz(filepath)
 
-        with open(filepath, 'r') as f:
-            reader = csv.reader(f)
+        self.frames = []
+        self._amplitudes = None
+        self._phases = None
+
+        if has_timestamp_column:
+            df = pd.read_csv(
+                filepath,
+                header=None,
+                names=['timestamp', 'raw_line'],
+                usecols=[0, 1],
+                dtype=str,
+                keep_default_na=False,
+                engine='c',
+                on_bad_lines='skip',
+            )
+        else:
+            with open(filepath, 'r') as f:
+                df = pd.DataFrame({'raw_line': f.read().splitlines()})
+            df['timestamp'] = ""
+
+        # Drops the header row and any non-CSI output
+        df = df[df['raw_line'].str.startswith('CSI_DATA')]
+        if df.empty:
+            return self.frames
+
+        fields = df['raw_line'].str.split(',', n=24, expand=True)
+        if fields.shape[1] < 25:
+            return self.frames
+        fields = fields[fields[24].notna()]
+        timestamps = df.loc[fields.index, 'timestamp']
+
+        raw = self._parse_raw_block(fields[24])
+        if raw is None:
+            # Frames have different lengths - parse one by one
+            for timestamp, line in zip(timestamps, df.loc[fields.index, 'raw_line']):
+                self._parse_row([timestamp, line], True)
+            return self.frames
+
+        # Metadata: strings for type/mac, integers (0 if invalid) for the rest
+        meta = fields.iloc[:, :24].copy()
+        meta.columns = _META_KEYS
+        for key in _META_KEYS:
+            if key not in ('type', 'mac'):
+                meta[key] = pd.to_numeric(meta[key].str.strip(), errors='coerce').fillna(0).astype(int)
+
+        # Convert (imag, real) pairs for all frames at once
+        csi_complex = _csi_complex(raw)
+        amplitudes = np.hypot(csi_complex.real, csi_complex.imag)
+        phases = np.angle(csi_complex)
+        self._amplitudes = amplitudes
+        self._phases = phases
+
+        for i, (frame, timestamp) in enumerate(zip(meta.to_dict('records'), timestamps)):
+            frame['csi_complex'] = csi_complex[i]
+            frame['amplitude'] = amplitudes[i]
+            frame['phase'] = phases[i]
+            frame['raw_data'] = raw[i]
+            frame['timestamp'] = timestamp
+            self.frames.append(frame)
 
-            # Skip header if present
-            first_row = next(reader, None)
-            if first_row and 'CSI_DATA' in str(first_row):
-                # First row is data, not header
-                self._parse_row(first_row, has_timestamp_column)
+        return self.frames
 
-            for row in reader:
-                self._parse_row(row, has_timestamp_column)
+    @staticmethod
+    def _parse_raw_block(tails: pd.Series) -> Optional[np.ndarray]:
+        """
+        Tokenize the raw CSI columns of many frames in one C call.
 
-        return self.frames
+        Returns:
+            int16 array of shape (n_frames, n_values), or None if the
+            frames do not all have the same number of values
+        """
+        tails = tails.str.translate(_CSI_STRIP).str.strip(', ')
+        counts = tails.str.count(',')
+        if counts.nunique() != 1 or (tails == '').any():
+            return None
+
+        n_values = int(counts.iloc[0]) + 1
+        if n_values < 2:
+            return None
+        raw = np.fromstring(','.join(tails), sep=',', dtype=np.int16)
+        if raw.size != len(tails) * n_values:
+            return None
+        return raw.reshape(len(tails), n_values)
 
     def _parse_row(self, row: List[str], has_timestamp: bool):
         """Parse a single CSV row."""
@@ -167,17 +588,59 @@ class CSIParser:
             parsed['timestamp'] = timestamp
             self.frames.append(parsed)
 
+    def load_npz(self, filepath: str) -> List[Dict]:
+        """
+        Load CSI data from a recording saved with save_npz.
+
+        No text has to be parsed, so this is much faster than load_file.
+        The frames only have amplitude, phase, rssi and timestamp.
+
+        Args:
+            filepath: Path to .npz file
+
+        Returns:
+            List of CSI frames
+        """
+        with np.load(filepath) as data:
+            amplitudes = data['amplitude']
+            phases = data['phase']
+            rssi = data['rssi'].tolist()
+            timestamps = data['timestamp'].tolist()
+
+        self.frames = [
+            {'amplitude': amplitudes[i], 'phase': phases[i], 'rssi': rssi[i], 'timestamp': timestamps[i]}
+            for i in range(len(amplitudes))
+        ]
+        self._amplitudes = amplitudes
+        self._phases = phases
+        return self.frames
+
     def get_amplitudes(self) -> np.ndarray:
-        """Get amplitude matrix (n_frames x n_subcarriers)."""
-        if not self.frames:
-            return np.array([])
-        return np.array([f['amplitude'] for f in self.frames])
+        """
+        Get amplitude matrix (n_frames x n_subcarriers).
+
+        For files loaded in one pass this is the matrix the frames'
+        amplitudes are rows of, returned without copying.
+        """
+        return self._frame_matrix('amplitude', self._amplitudes)
 
     def get_phases(self) -> np.ndarray:
-        """Get phase matrix (n_frames x n_subcarriers)."""
+        """Get phase matrix (n_frames x n_subcarriers), see get_amplitudes."""
+        return self._frame_matrix('phase', self._phases)
+
+    def _frame_matrix(self, key: str, loaded: Optional[np.ndarray]) -> np.ndarray:
+        """Stack one per-frame array of all frames into a matrix."""
         if not self.frames:
             return np.array([])
-        return np.array([f['phase'] for f in self.frames])
+        if loaded is not None and len(loaded) == len(self.frames):
+            return loaded
+
+        # Copy rows into a preallocated matrix instead of going through a list
+        first = self.frames[0][key]
+        out = np.empty((len(self.frames), len(first)), dtype=first.dtype)
+        for i, frame in enumerate(self.frames):
+            out[i] = frame[key]
+        return out
 
     def get_rssi(self) -> np.ndarray:
         """Get RSSI values for all frames."""
@@ -202,3 +665,40 @@ def load_csi_file(filepath: str) -> List[Dict]:
     """
     parser = CSIParser()
     return parser.load_file(filepath)
+
+
+def save_npz(filepath: str, frames: List[Dict]):
+    """
+    Save CSI frames as a NumPy .npz recording (see CSIParser.load_npz).
+
+    Amplitude, phase, rssi and timestamp are stored column-wise, so all
+    frames must have the same number of subcarriers.
+
+    Args:
+        filepath: Output .npz path
+        frames: Parsed CSI frames
+    """
+    np.savez(
+        filepath,
+        amplitude=np.array([f['amplitude'] for f in frames], dtype=np.float32),
+        phase=np.array([f['phase'] for f in frames], dtype=np.float32),
+        rssi=np.array([f['rssi'] for f in frames], dtype=np.int16),
+        timestamp=np.array([f.get('timestamp', '') for f in frames], dtype=str),
+    )
+
+
+def convert_csv_to_npz(csv_path: str, npz_path: Optional[str] = None) -> str:
+    """
+    Convert a CSV recording to .npz, so later loads skip text parsing.
+
+    Args:
+        csv_path: Path to CSV recording
+        npz_path: Output path (default: csv_path with a .npz extension)
+
+    Returns:
+        Path of the written .npz file
+    """
+    if npz_path is None:
+        npz_path = os.path.splitext(csv_path)[0] + '.npz'
+    save_npz(npz_path, CSIParser().load_file(csv_path))
+    return npz_path
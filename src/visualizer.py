@@ -4,11 +4,179 @@ CSI Data Visualizer
 Provides visualization tools for CSI amplitude, phase, and detection results.
 """
 
+import weakref
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 from typing import List, Optional, Dict, Tuple
-from collections import deque
+
+try:
+    import bottleneck as bn
+except ImportError:  # bottleneck is optional, fall back to plain NumPy
+    bn = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to plain NumPy
+    njit = None
+
+
+def _rolling_variance(values: np.ndarray, window_size: int) -> np.ndarray:
+    """
+    Variance of each window values[i:i + window_size], i < len(values) - window_size.
+
+    Uses bottleneck's streaming move_var when available; otherwise the
+    window sums are taken as differences of cumulative sums. Either way
+    it is O(n) instead of one np.var call per window.
+
+    Args:
+        values: 1D array
+        window_size: Samples per window
+
+    Returns:
+        Array of len(values) - window_size variances (empty if too short)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values) - window_size
+    if n <= 0:
+        return np.empty(0)
+
+    if bn is not None:
+        return bn.move_var(values, window_size)[window_size - 1:window_size - 1 + n]
+
+    # Centering first keeps E[x^2] - E[x]^2 from cancelling out
+    centered = values - values.mean()
+    # Cumulative sums go straight into zero-led buffers and the rest
+    # is done in place, so no n-sized temporaries are made
+    sums = np.zeros(len(values) + 1)
+    np.cumsum(centered, out=sums[1:])
+    sums_sq = np.zeros(len(values) + 1)
+    np.cumsum(np.square(centered, out=centered), out=sums_sq[1:])
+    mean = sums[window_size:window_size + n] - sums[:n]
+    mean /= window_size
+    variance = sums_sq[window_size:window_size + n] - sums_sq[:n]
+    variance /= window_size
+    variance -= mean * mean
+    return np.maximum(variance, 0.0, out=variance)
+
+
+def _frame_stats(amplitudes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mean amplitude of each frame and variance of each subcarrier.
+
+    Args:
+        amplitudes: Array of shape (n_frames, n_subcarriers)
+
+    Returns:
+        Tuple of (mean per frame, variance per subcarrier)
+    """
+    return np.mean(amplitudes, axis=1), np.var(amplitudes, axis=0)
+
+
+if njit is not None:
+    @njit(fastmath=True)
+    def _frame_stats_kernel(amplitudes, frame_mean, subcarrier_var):
+        n_frames, n_subcarriers = amplitudes.shape
+        # Sums are taken relative to the first frame so that the
+        # one-pass variance does not cancel out
+        shift = amplitudes[0].astype(np.float64)
+        sums = np.zeros(n_subcarriers)
+        sums_sq = np.zeros(n_subcarriers)
+        for i in range(n_frames):
+            total = 0.0
+            for j in range(n_subcarriers):
+                value = amplitudes[i, j]
+                total += value
+                delta = value - shift[j]
+                sums[j] += delta
+                sums_sq[j] += delta * delta
+            frame_mean[i] = total / n_subcarriers
+        for j in range(n_subcarriers):
+            mean = sums[j] / n_frames
+            subcarrier_var[j] = max(sums_sq[j] / n_frames - mean * mean, 0.0)
+
+    def _frame_stats(amplitudes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # Both reductions in a single row-major pass over the data
+        amplitudes = np.ascontiguousarray(amplitudes)
+        if amplitudes.ndim != 2 or 0 in amplitudes.shape:
+            return np.mean(amplitudes, axis=1), np.var(amplitudes, axis=0)
+        dtype = np.float32 if amplitudes.dtype == np.float32 else np.float64
+        frame_mean = np.empty(amplitudes.shape[0], dtype=dtype)
+        subcarrier_var = np.empty(amplitudes.shape[1], dtype=dtype)
+        _frame_stats_kernel(amplitudes, frame_mean, subcarrier_var)
+        return frame_mean, subcarrier_var
+
+
+# Reductions of the last few arrays plotted. Keys are id()s, so each
+# entry also holds a weak reference to confirm it is the same array.
+_reduction_cache: Dict[Tuple[str, int], Tuple[weakref.ref, object]] = {}
+_REDUCTION_CACHE_SIZE = 8
+
+
+def _cached(name: str, func, array: np.ndarray):
+    """
+    Return func(array), reusing the result of an earlier call on the same array.
+
+    Lets repeated plots of one capture (e.g. in a notebook) skip the
+    reductions. Arrays must not be modified in place between plots.
+
+    Args:
+        name: Name of the reduction, to tell cached results apart
+        func: Reduction to apply
+        array: Input array
+
+    Returns:
+        func(array), possibly from the cache (do not modify it)
+    """
+    key = (name, id(array))
+    entry = _reduction_cache.get(key)
+    if entry is not None and entry[0]() is array:
+        return entry[1]
+
+    result = func(array)
+    try:
+        ref = weakref.ref(array)
+    except TypeError:  # Lists etc. can't be weakly referenced
+        return result
+    if len(_reduction_cache) >= _REDUCTION_CACHE_SIZE:
+        del _reduction_cache[next(iter(_reduction_cache))]
+    _reduction_cache[key] = (ref, result)
+    return result
+
+
+def _mean_amplitude(amplitudes: np.ndarray) -> np.ndarray:
+    """Mean amplitude of each frame, cached per array."""
+    return _cached('mean', lambda a: np.mean(a, axis=1), amplitudes)
+
+
+def _heatmap_image(
+    amplitudes: np.ndarray,
+    width_inches: float
+) -> Tuple[np.ndarray, Tuple[float, float, float, float]]:
+    """
+    Image and extent for an amplitude heatmap, bin-averaged along time if long.
+
+    imshow resamples the whole source image on every draw, so captures
+    with far more frames than the figure has pixels are averaged down to
+    about 150 columns per inch first. Drawing is then O(target * n_subcarriers)
+    instead of O(n_frames * n_subcarriers).
+
+    Args:
+        amplitudes: Array of shape (n_frames, n_subcarriers)
+        width_inches: Width of the figure the heatmap is drawn in
+
+    Returns:
+        Tuple of (image of shape (n_subcarriers, n_columns), imshow extent
+        keeping the x axis in packets)
+    """
+    n_frames, n_subcarriers = amplitudes.shape
+    target = int(width_inches * 150)
+    if n_frames > 4 * target:
+        k = n_frames // target
+        n_frames = n_frames // k * k
+        amplitudes = amplitudes[:n_frames].reshape(-1, k, n_subcarriers).mean(axis=1)
+    extent = (-0.5, n_frames - 0.5, n_subcarriers - 0.5, -0.5)
+    return np.ascontiguousarray(amplitudes.T), extent
 
 
 class CSIVisualizer:
@@ -37,10 +205,13 @@ class CSIVisualizer:
             title: Plot title
             save_path: Optional path to save figure
         """
+        amplitudes = np.asarray(amplitudes, dtype=np.float32)
         fig, ax = plt.subplots(figsize=(12, 6))
 
+        image, extent = _heatmap_image(amplitudes, 12)
         im = ax.imshow(
-            amplitudes.T,
+            image,
+            extent=extent,
             aspect='auto',
             cmap='viridis',
             interpolation='nearest'
@@ -55,6 +226,10 @@ class CSIVisualizer:
             plt.savefig(save_path, dpi=150)
             print(f"Saved to {save_path}")
         plt.show()
+        # In a blocking session the figure is done once shown; release it
+        # so repeated plots don't pile up. Interactive sessions keep it.
+        if not plt.isinteractive():
+            plt.close(fig)
 
     def plot_amplitude_over_time(
         self,
@@ -72,15 +247,18 @@ class CSIVisualizer:
             title: Plot title
             save_path: Optional path to save figure
         """
+        amplitudes = np.asarray(amplitudes, dtype=np.float32)
         n_plots = 3 if rssi is None else 4
         fig, axes = plt.subplots(n_plots, 1, figsize=self.figsize)
 
-        mean_amp = np.mean(amplitudes, axis=1)
+        mean_amp = _mean_amplitude(amplitudes)
 
         # 1. Amplitude heatmap
         ax = axes[0]
+        image, extent = _heatmap_image(amplitudes, self.figsize[0])
         im = ax.imshow(
-            amplitudes.T,
+            image,
+            extent=extent,
             aspect='auto',
             cmap='viridis',
             interpolation='nearest'
@@ -102,9 +280,7 @@ class CSIVisualizer:
         ax = axes[2]
         window_size = min(50, len(mean_amp) // 10)
         if window_size > 1:
-            variance = []
-            for i in range(len(mean_amp) - window_size):
-                variance.append(np.var(mean_amp[i:i + window_size]))
+            variance = _rolling_variance(mean_amp, window_size)
             ax.plot(variance, 'r-', linewidth=0.5)
         ax.set_xlabel('Time (packets)')
         ax.set_ylabel('Amplitude Variance')
@@ -127,6 +303,8 @@ class CSIVisualizer:
             plt.savefig(save_path, dpi=150)
             print(f"Saved to {save_path}")
         plt.show()
+        if not plt.isinteractive():
+            plt.close(fig)
 
     def plot_comparison(
         self,
@@ -144,10 +322,12 @@ class CSIVisualizer:
             labels: Labels for baseline and motion
             save_path: Optional path to save figure
         """
+        baseline = np.asarray(baseline, dtype=np.float32)
+        motion = np.asarray(motion, dtype=np.float32)
         fig, axes = plt.subplots(2, 2, figsize=(14, 10))
 
-        baseline_mean = np.mean(baseline, axis=1)
-        motion_mean = np.mean(motion, axis=1)
+        baseline_mean, baseline_var = _cached('stats', _frame_stats, baseline)
+        motion_mean, motion_var = _cached('stats', _frame_stats, motion)
 
         # Baseline heatmap
         ax = axes[0, 0]
@@ -177,8 +357,6 @@ class CSIVisualizer:
 
         # Variance comparison (boxplot)
         ax = axes[1, 1]
-        baseline_var = np.var(baseline, axis=0)
-        motion_var = np.var(motion, axis=0)
         ax.boxplot([baseline_var, motion_var], labels=labels)
         ax.set_title('Per-Subcarrier Variance Distribution')
         ax.set_ylabel('Variance')
@@ -197,12 +375,14 @@ class CSIVisualizer:
             plt.savefig(save_path, dpi=150)
             print(f"Saved to {save_path}")
         plt.show()
+        if not plt.isinteractive():
+            plt.close(fig)
 
     def plot_detection_results(
         self,
         amplitudes: np.ndarray,
-        detections: List[bool],
-        confidences: List[float],
+        detections: np.ndarray,
+        confidences: np.ndarray,
         threshold: float,
         save_path: Optional[str] = None
     ):
@@ -211,26 +391,34 @@ class CSIVisualizer:
 
         Args:
             amplitudes: CSI amplitude data
-            detections: Boolean detection results per frame
-            confidences: Detection confidence per frame
+            detections: Boolean detection results per frame (array or list)
+            confidences: Detection confidence per frame (array or list)
             threshold: Detection threshold used
             save_path: Optional path to save figure
         """
+        amplitudes = np.asarray(amplitudes, dtype=np.float32)
         fig, axes = plt.subplots(3, 1, figsize=(14, 10))
 
-        mean_amp = np.mean(amplitudes, axis=1)
+        mean_amp = _mean_amplitude(amplitudes)
         n_frames = len(mean_amp)
 
+        # Convert once at the boundary; slicing first keeps long lists
+        # from being converted past n_frames, and is a view for arrays
+        detections = np.asarray(detections[:n_frames], dtype=np.int8)
+        confidences = np.asarray(confidences[:n_frames], dtype=np.float32)
+
         # 1. Amplitude with detection overlay
         ax = axes[0]
         ax.plot(mean_amp, 'b-', linewidth=0.5, label='Mean Amplitude')
 
-        # Shade detection regions
-        detection_arr = np.array(detections[:n_frames])
-        ax.fill_between(
-            range(len(detection_arr)),
-            0, ax.get_ylim()[1] if ax.get_ylim()[1] > 0 else max(mean_amp),
-            where=detection_arr,
+        # Shade detection regions, one bar per run of detected frames
+        edges = np.diff(np.concatenate(([0], detections, [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        ymax = ax.get_ylim()[1] if ax.get_ylim()[1] > 0 else max(mean_amp)
+        ax.broken_barh(
+            list(zip(starts, ends - starts)),
+            (0, ymax),
             alpha=0.3,
             color='red',
             label='Presence Detected'
@@ -243,7 +431,7 @@ class CSIVisualizer:
 
         # 2. Detection confidence
         ax = axes[1]
-        ax.plot(confidences[:n_frames], 'g-', linewidth=0.5)
+        ax.plot(confidences, 'g-', linewidth=0.5)
         ax.axhline(y=0.5, color='r', linestyle='--', label='50% confidence')
         ax.set_xlabel('Time (frames)')
         ax.set_ylabel('Confidence')
@@ -255,9 +443,7 @@ class CSIVisualizer:
         # 3. Variance with threshold
         ax = axes[2]
         window_size = 50
-        variances = []
-        for i in range(len(mean_amp) - window_size):
-            variances.append(np.var(mean_amp[i:i + window_size]))
+        variances = _rolling_variance(mean_amp, window_size)
         ax.plot(variances, 'b-', linewidth=0.5, label='Rolling Variance')
         ax.axhline(y=threshold, color='r', linestyle='--', label=f'Threshold ({threshold:.1f})')
         ax.set_xlabel('Time (frames)')
@@ -272,6 +458,8 @@ class CSIVisualizer:
             plt.savefig(save_path, dpi=150)
             print(f"Saved to {save_path}")
         plt.show()
+        if not plt.isinteractive():
+            plt.close(fig)
 
 
 class LiveVisualizer:
@@ -292,14 +480,22 @@ class LiveVisualizer:
         self.window_size = window_size
         self.n_subcarriers = n_subcarriers
 
-        self.amplitude_buffer = deque(maxlen=window_size)
-        self.variance_buffer = deque(maxlen=window_size)
-        self.detection_buffer = deque(maxlen=window_size)
+        # Ring buffers: _index is the next slot to write, _filled how
+        # many slots hold data
+        self.amplitude_buffer = np.zeros(window_size, dtype=np.float32)
+        self.variance_buffer = np.zeros(window_size, dtype=np.float32)
+        self.detection_buffer = np.zeros(window_size, dtype=bool)
+        self._index = 0
+        self._filled = 0
+        self._x = np.arange(window_size)
 
         self.fig = None
         self.axes = None
         self.lines = {}
         self.is_running = False
+        self._background = None
+        self._status = None
+        self._threshold = None
 
     def setup(self):
         """Set up the live plot."""
@@ -308,7 +504,7 @@ class LiveVisualizer:
 
         # Amplitude line
         ax = self.axes[0]
-        self.lines['amplitude'], = ax.plot([], [], 'b-', linewidth=0.5)
+        self.lines['amplitude'], = ax.plot([], [], 'b-', linewidth=0.5, animated=True)
         ax.set_xlim(0, self.window_size)
         ax.set_ylim(0, 100)
         ax.set_xlabel('Time (frames)')
@@ -318,8 +514,8 @@ class LiveVisualizer:
 
         # Variance line
         ax = self.axes[1]
-        self.lines['variance'], = ax.plot([], [], 'r-', linewidth=0.5)
-        self.lines['threshold'] = ax.axhline(y=50, color='g', linestyle='--')
+        self.lines['variance'], = ax.plot([], [], 'r-', linewidth=0.5, animated=True)
+        self.lines['threshold'] = ax.axhline(y=50, color='g', linestyle='--', animated=True)
         ax.set_xlim(0, self.window_size)
         ax.set_ylim(0, 200)
         ax.set_xlabel('Time (frames)')
@@ -328,9 +524,46 @@ class LiveVisualizer:
         ax.grid(True, alpha=0.3)
 
         plt.tight_layout()
+        # The lines are animated, so every full draw refreshes the cached
+        # background they are blitted onto
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        plt.show(block=False)
         self.fig.canvas.draw()
         self.is_running = True
 
+    def _on_draw(self, event):
+        """Cache the static background and paint the animated lines on top."""
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_lines()
+
+    def _draw_lines(self):
+        """Draw the animated lines onto the canvas."""
+        for line in self.lines.values():
+            self.fig.draw_artist(line)
+
+    def _ordered(self, buffer: np.ndarray) -> np.ndarray:
+        """Filled part of a ring buffer, oldest first."""
+        return np.concatenate((buffer[self._index:self._filled], buffer[:self._index]))
+
+    @staticmethod
+    def _rescale(ax, low: float, high: float) -> bool:
+        """
+        Move the y limits if the data left them or fills less than half.
+
+        Args:
+            ax: Axes to rescale
+            low: Lowest y value wanted in view
+            high: Highest y value wanted in view
+
+        Returns:
+            True if the limits changed
+        """
+        cur_low, cur_high = ax.get_ylim()
+        if low < cur_low or high > cur_high or (high - low) < 0.5 * (cur_high - cur_low):
+            ax.set_ylim(low, high)
+            return True
+        return False
+
     def update(
         self,
         amplitude: np.ndarray,
@@ -351,31 +584,52 @@ class LiveVisualizer:
             self.setup()
 
         mean_amp = np.mean(amplitude)
-        self.amplitude_buffer.append(mean_amp)
-        self.variance_buffer.append(variance)
-        self.detection_buffer.append(is_detected)
+        self.amplitude_buffer[self._index] = mean_amp
+        self.variance_buffer[self._index] = variance
+        self.detection_buffer[self._index] = is_detected
+        self._index = (self._index + 1) % self.window_size
+        self._filled = min(self._filled + 1, self.window_size)
+
+        # Min/max don't care about order, so reduce the filled slots
+        # in place and only unroll the ring for the lines themselves
+        filled = self._filled
+        amplitudes = self.amplitude_buffer[:filled]
+        variances = self.variance_buffer[:filled]
+        x = self._x[:filled]
 
         # Update amplitude plot
-        x = list(range(len(self.amplitude_buffer)))
-        self.lines['amplitude'].set_data(x, list(self.amplitude_buffer))
-        self.axes[0].set_ylim(
-            min(self.amplitude_buffer) * 0.9,
-            max(self.amplitude_buffer) * 1.1
+        self.lines['amplitude'].set_data(x, self._ordered(self.amplitude_buffer))
+        rescaled = self._rescale(
+            self.axes[0],
+            amplitudes.min() * 0.9,
+            amplitudes.max() * 1.1
         )
 
         # Update title with detection status
         status = "PRESENCE DETECTED" if is_detected else "No presence"
-        self.axes[0].set_title(f'Real-time CSI Amplitude - {status}')
+        if status != self._status:
+            self._status = status
+            self.axes[0].set_title(f'Real-time CSI Amplitude - {status}')
+            rescaled = True
 
         # Update variance plot
-        self.lines['variance'].set_data(x, list(self.variance_buffer))
-        self.lines['threshold'].set_ydata([threshold, threshold])
-        self.axes[1].set_ylim(0, max(max(self.variance_buffer) * 1.1, threshold * 2))
+        self.lines['variance'].set_data(x, self._ordered(self.variance_buffer))
+        if threshold != self._threshold:
+            self._threshold = threshold
+            self.lines['threshold'].set_ydata([threshold, threshold])
+        rescaled |= self._rescale(
+            self.axes[1], 0, max(variances.max() * 1.1, threshold * 2)
+        )
 
-        # Refresh display
-        self.fig.canvas.draw()
+        # Refresh display: a full draw only when ticks or title changed,
+        # otherwise blit the lines over the cached background
+        if rescaled or self._background is None:
+            self.fig.canvas.draw()
+        else:
+            self.fig.canvas.restore_region(self._background)
+            self._draw_lines()
+            self.fig.canvas.blit(self.fig.bbox)
         self.fig.canvas.flush_events()
-        plt.pause(0.001)
 
     def close(self):
         """Close the live plot."""
@@ -0,0 +1,100 @@
+"""Tests for the CSI line parser."""
+
+import os
+import struct
+import sys
+import zlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from parser import BINARY_MAGIC, parse_binary_frames, parse_csi_line, parse_csi_lines
+
+
+LINE = (
+    'CSI_DATA,0,1,aa:bb:cc:dd:ee:ff,-45,11,1,7,0,0,0,0,0,0,0,-92,0,6,0,'
+    '123456,0,128,0,128,0,"[4,-3,1,2,10,-7,0,5,-8,6]"'
+)
+
+# (imag, real) pairs; 10 = 0x0A, the byte a CRLF console would mangle
+VALUES = [4, -3, 1, 2, 10, -7, 0, 5, -8, 6, 2570, -1]
+
+
+def binary_frame(values=VALUES, seq=7, rssi=-45):
+    """Encode a frame the way firmware/README.md describes."""
+    body = struct.pack('<HIbx', len(values), seq, rssi) + struct.pack(f'<{len(values)}h', *values)
+    return BINARY_MAGIC + body + struct.pack('<I', zlib.crc32(body))
+
+
+def test_brackets_keep_first_and_last_values():
+    bare = parse_csi_line(LINE.replace('"[', '').replace(']"', ''))
+    frame = parse_csi_line(LINE)
+    np.testing.assert_array_equal(frame['raw_data'], bare['raw_data'])
+    np.testing.assert_array_equal(frame['amplitude'], bare['amplitude'])
+    assert frame['raw_data'][-1] == 6
+
+
+def test_trailing_newline_parses_like_bare_line():
+    expected = parse_csi_line(LINE)
+    assert expected is not None
+
+    for suffix in ('\n', '\r\n'):
+        frame = parse_csi_line(LINE + suffix)
+        assert frame is not None
+        np.testing.assert_array_equal(frame['amplitude'], expected['amplitude'])
+        np.testing.assert_array_equal(frame['phase'], expected['phase'])
+
+
+def test_batch_with_newlines_matches_single_line():
+    expected = parse_csi_line(LINE)
+    for frame in parse_csi_lines([LINE + '\n', LINE, LINE + '\r\n']):
+        assert frame is not None
+        np.testing.assert_array_equal(frame['amplitude'], expected['amplitude'])
+
+
+def test_binary_frame_round_trip():
+    buffer = bytearray(binary_frame())
+    frames = parse_binary_frames(buffer)
+
+    assert len(frames) == 1
+    frame = frames[0]
+    assert frame['id'] == 7
+    assert frame['rssi'] == -45
+    np.testing.assert_array_equal(frame['raw_data'], VALUES)
+    pairs = np.array(VALUES).reshape(-1, 2)[2:]
+    np.testing.assert_allclose(frame['amplitude'], np.hypot(pairs[:, 0], pairs[:, 1]), rtol=1e-6)
+    assert buffer == bytearray()
+
+
+def test_binary_resyncs_after_garbage():
+    # Text, a false magic and a truncated header before the real frames
+    garbage = b'I (123) boot: done\r\n' + BINARY_MAGIC + b'\x03\x00junk'
+    buffer = bytearray(garbage + binary_frame(seq=1) + binary_frame(seq=2))
+    frames = parse_binary_frames(buffer)
+
+    assert [frame['id'] for frame in frames] == [1, 2]
+    assert buffer == bytearray()
+
+
+def test_binary_frame_split_across_reads():
+    data = binary_frame()
+    for split in (1, 5, len(data) - 1):
+        buffer = bytearray(data[:split])
+        assert parse_binary_frames(buffer) == []
+        assert buffer == bytearray(data[:split])
+
+        buffer.extend(data[split:])
+        frames = parse_binary_frames(buffer)
+        assert [frame['id'] for frame in frames] == [7]
+        assert buffer == bytearray()
+
+
+def test_binary_bad_crc_is_skipped():
+    corrupted = bytearray(binary_frame(seq=1))
+    corrupted[12] ^= 0xFF  # Inside the CSI values
+    buffer = corrupted + binary_frame(seq=2)
+    frames = parse_binary_frames(buffer)
+
+    assert [frame['id'] for frame in frames] == [2]
+    assert buffer == bytearray()